@@ -0,0 +1,17 @@
+from django.urls import path
+
+from api.async_views import (
+    ingredient_list,
+    recipe_detail,
+    recipe_list,
+    tag_detail,
+    tag_list,
+)
+
+urlpatterns = [
+    path('tags/', tag_list),
+    path('tags/<int:pk>/', tag_detail),
+    path('ingredients/', ingredient_list),
+    path('recipes/', recipe_list),
+    path('recipes/<int:pk>/', recipe_detail),
+]
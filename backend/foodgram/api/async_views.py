@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from api.views import IngredientViewSet, RecipeViewSet, TagViewSet
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+read_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_READ_WORKERS,
+    thread_name_prefix='async-read'
+)
+
+
+def run_view(view, request, *args, **kwargs):
+    try:
+        response = view(request, *args, **kwargs)
+        response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(viewset, actions):
+    view = viewset.as_view(actions)
+    read = sync_to_async(
+        run_view, thread_sensitive=False, executor=read_executor
+    )
+    write = sync_to_async(run_view)
+
+    async def handler(request, *args, **kwargs):
+        if request.method in READ_METHODS:
+            return await read(view, request, *args, **kwargs)
+        return await write(view, request, *args, **kwargs)
+
+    handler.csrf_exempt = True
+    return handler
+
+
+tag_list = async_view(TagViewSet, {'get': 'list'})
+tag_detail = async_view(TagViewSet, {'get': 'retrieve'})
+ingredient_list = async_view(IngredientViewSet, {'get': 'list'})
+recipe_list = async_view(RecipeViewSet, {'get': 'list', 'post': 'create'})
+recipe_detail = async_view(RecipeViewSet, {
+    'get': 'retrieve',
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy',
+})
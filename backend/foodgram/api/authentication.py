@@ -0,0 +1,138 @@
+import copy
+import threading
+import time
+from collections import Counter, OrderedDict
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+TOKEN_CACHE_KEY = 'auth_token:{digest}'
+
+
+class LocalTokenStore:
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                return None
+            token, expires = item
+            if expires < time.monotonic():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+            return token
+
+    def set(self, key, token):
+        with self.lock:
+            self.items[key] = (token, time.monotonic() + self.timeout)
+            self.items.move_to_end(key)
+            evicted = 0
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def delete(self, key):
+        with self.lock:
+            self.items.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+class SharedTokenStore:
+
+    def __init__(self, alias, timeout):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, token):
+        self.cache.set(key, token, self.timeout)
+        return 0
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        pass
+
+
+class TokenCache:
+
+    def __init__(self):
+        self.metrics = Counter()
+        self.store = None
+
+    def get_store(self):
+        if self.store is None:
+            if settings.TOKEN_CACHE_ALIAS:
+                self.store = SharedTokenStore(
+                    settings.TOKEN_CACHE_ALIAS, settings.TOKEN_CACHE_TTL
+                )
+            else:
+                self.store = LocalTokenStore(
+                    settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL
+                )
+        return self.store
+
+    @staticmethod
+    def make_key(key):
+        return TOKEN_CACHE_KEY.format(
+            digest=sha256(key.encode('utf-8')).hexdigest()
+        )
+
+    def get(self, key):
+        token = self.get_store().get(self.make_key(key))
+        self.metrics['hits' if token is not None else 'misses'] += 1
+        return token
+
+    def set(self, key, token):
+        self.metrics['evictions'] += self.get_store().set(
+            self.make_key(key), token
+        )
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self.get_store().delete(self.make_key(key))
+        self.metrics['invalidations'] += len(keys)
+
+    def stats(self):
+        lookups = self.metrics['hits'] + self.metrics['misses']
+        return {
+            **{
+                name: self.metrics[name]
+                for name in ('hits', 'misses', 'evictions', 'invalidations')
+            },
+            'hit_rate': self.metrics['hits'] / lookups if lookups else None,
+            'backend': settings.TOKEN_CACHE_ALIAS or 'local',
+        }
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is not None:
+            # the cached instances are shared between requests
+            token = copy.copy(token)
+            token.user = copy.copy(token.user)
+            return token.user, token
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, token)
+        return user, token
@@ -0,0 +1,90 @@
+from django.db import IntegrityError, connection, transaction
+
+from api.serializers import BulkIdsSerializer
+from recipes.signals import links_changed
+
+CREATED = 'created'
+EXISTS = 'exists'
+DELETED = 'deleted'
+NOT_FOUND = 'not_found'
+FORBIDDEN = 'forbidden'
+
+
+def insert_links(model, links):
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(links)
+        return links
+    except IntegrityError:
+        pass
+    inserted = []
+    for link in links:
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([link])
+        except IntegrityError:
+            continue
+        inserted.append(link)
+    return inserted
+
+
+def delete_links(model, pks):
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(model._meta.pk.column)} IN ({placeholders})',
+            list(pks)
+        )
+
+
+def link_many(user, model, field, targets, ids, forbidden=()):
+    ids = list(dict.fromkeys(ids))
+    found = set(targets.filter(pk__in=ids).values_list('pk', flat=True))
+    statuses = {pk: NOT_FOUND for pk in ids}
+    statuses.update((pk, FORBIDDEN) for pk in found & set(forbidden))
+    found -= set(forbidden)
+    with transaction.atomic():
+        existing = set(model.objects.filter(
+            user=user, **{f'{field}__in': found}
+        ).values_list(field, flat=True))
+        created = [
+            getattr(link, f'{field}_id') for link in insert_links(model, [
+                model(user=user, **{f'{field}_id': pk})
+                for pk in ids if pk in found - existing
+            ])
+        ]
+        if created:
+            links_changed.send(
+                sender=model, user_id=user.id, pks=created, delta=1
+            )
+    statuses.update((pk, EXISTS) for pk in found)
+    statuses.update((pk, CREATED) for pk in created)
+    return [{'id': pk, 'status': statuses[pk]} for pk in ids]
+
+
+def unlink_many(user, model, field, ids):
+    ids = list(dict.fromkeys(ids))
+    with transaction.atomic():
+        links = dict(model.objects.select_for_update().filter(
+            user=user, **{f'{field}__in': ids}
+        ).values_list('pk', field))
+        if links:
+            # links_changed replaces the per-row delete signals
+            delete_links(model, links)
+            links_changed.send(
+                sender=model, user_id=user.id, pks=list(links.values()),
+                delta=-1
+            )
+    found = set(links.values())
+    return [
+        {'id': pk, 'status': DELETED if pk in found else NOT_FOUND}
+        for pk in ids
+    ]
+
+
+def get_ids(request):
+    serializer = BulkIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data['ids']
@@ -0,0 +1,116 @@
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+RESPONSE_VERSION_KEY = 'response_version:{resource}'
+RECIPE_CARD_VERSION_KEY = 'recipe_card_version'
+RECIPE_CARD_KEY = 'recipe_card:{version}:{pk}'
+
+
+def get_version(key):
+    # a fresh seed never repeats a version used before the key was lost
+    return cache.get_or_set(key, time.time_ns, None)
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def invalidate_responses(*resources):
+    for resource in resources:
+        bump_version(RESPONSE_VERSION_KEY.format(resource=resource))
+
+
+def get_recipe_card_keys(pks):
+    version = get_version(RECIPE_CARD_VERSION_KEY)
+    return [RECIPE_CARD_KEY.format(version=version, pk=pk) for pk in pks]
+
+
+def get_recipe_cards(recipes, build_cards):
+    keys = get_recipe_card_keys(recipe.pk for recipe in recipes)
+    cards = cache.get_many(keys)
+    missing = [
+        (key, recipe) for key, recipe in zip(keys, recipes)
+        if key not in cards
+    ]
+    if missing:
+        missing = dict(zip(
+            (key for key, _ in missing),
+            build_cards([recipe for _, recipe in missing])
+        ))
+        cache.set_many(missing, settings.RECIPE_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    return [cards[key] for key in keys]
+
+
+def invalidate_recipe_cards(pks=None):
+    if pks is None:
+        bump_version(RECIPE_CARD_VERSION_KEY)
+    else:
+        cache.delete_many(get_recipe_card_keys(pks))
+
+
+class ResponseCacheMixin:
+    cache_resources = ()
+    cache_anonymous_only = False
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            self.get_list_response, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_list_response(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def get_response_cache_key(self, request):
+        versions = ':'.join(
+            str(get_version(RESPONSE_VERSION_KEY.format(resource=resource)))
+            for resource in self.cache_resources
+        )
+        scope = 'anon' if self.cache_anonymous_only else 'all'
+        path = md5(
+            request.build_absolute_uri().encode('utf-8')
+        ).hexdigest()
+        return f'response:{versions}:{scope}:{path}'
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if self.cache_anonymous_only and request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            cached = (
+                response.data,
+                quote_etag(md5(JSONRenderer().render(
+                    response.data
+                )).hexdigest()),
+                int(timezone.now().timestamp())
+            )
+            cache.set(key, cached, settings.RESPONSE_CACHE_TIMEOUT)
+        data, etag, last_modified = cached
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = Response(data)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.checks import Error, register
+from django.core.exceptions import ImproperlyConfigured
+
+from api.renderers import PDFShoppingListRenderer
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared_cache(alias):
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    return backend is not None and backend not in PROCESS_LOCAL_CACHES
+
+
+@register(deploy=True)
+def shared_cache_check(app_configs, **kwargs):
+    if settings.DEBUG or is_shared_cache('default'):
+        return []
+    return [Error(
+        'Кэш по умолчанию виден только одному процессу: сброс кэша '
+        'из worker не дойдёт до backend.',
+        hint='Укажите общий CACHE_BACKEND, например '
+             'django.core.cache.backends.memcached.PyMemcacheCache.',
+        id='api.E001',
+    )]
+
+
+@register(deploy=True)
+def token_cache_check(app_configs, **kwargs):
+    if settings.DEBUG or is_shared_cache(settings.TOKEN_CACHE_ALIAS):
+        return []
+    return [Error(
+        'Токены кэшируются в памяти процесса: отозванный токен '
+        'продолжит работать в других процессах.',
+        hint='Укажите в TOKEN_CACHE_ALIAS общий кэш, например default.',
+        id='api.E002',
+    )]
+
+
+@register(deploy=True)
+def pdf_font_check(app_configs, **kwargs):
+    try:
+        PDFShoppingListRenderer.get_font()
+    except ImproperlyConfigured as error:
+        return [Error(
+            str(error),
+            hint='Установите fonts-dejavu-core или укажите PDF_FONT_PATH.',
+            id='api.E003',
+        )]
+    return []
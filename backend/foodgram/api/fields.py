@@ -0,0 +1,67 @@
+import filetype
+from drf_extra_fields.fields import Base64FileField, Base64ImageField
+from rest_framework.fields import Field
+from rest_framework.serializers import ValidationError
+
+RENDITION_SIZE_KEYS = ('width', 'height')
+
+
+class RecipeImageField(Base64FileField):
+    ALLOWED_TYPES = Base64ImageField.ALLOWED_TYPES
+    INVALID_FILE_MESSAGE = Base64ImageField.INVALID_FILE_MESSAGE
+    INVALID_TYPE_MESSAGE = Base64ImageField.INVALID_TYPE_MESSAGE
+
+    def get_file_extension(self, filename, decoded_file):
+        extension = filetype.guess_extension(decoded_file)
+        if extension is None:
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+        return 'jpg' if extension == 'jpeg' else extension
+
+
+class ImageRenditionsField(Field):
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        request = self.context.get('request')
+        renditions = {}
+        for rendition in recipe.renditions.all():
+            url = rendition.file.url
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            renditions.setdefault(rendition.name, {
+                'width': rendition.width,
+                'height': rendition.height,
+            })[rendition.format] = url
+        return get_images(renditions)
+
+
+def get_images(renditions):
+    srcset = {}
+    for rendition in renditions.values():
+        for image_format, url in rendition.items():
+            if image_format not in RENDITION_SIZE_KEYS:
+                srcset.setdefault(image_format, []).append(
+                    f'{url} {rendition["width"]}w'
+                )
+    return {
+        'renditions': renditions,
+        'srcset': {
+            image_format: ', '.join(sources)
+            for image_format, sources in srcset.items()
+        },
+    }
+
+
+def absolute_images(images, request):
+    return get_images({
+        name: {
+            key: (value if key in RENDITION_SIZE_KEYS
+                  else request.build_absolute_uri(value))
+            for key, value in rendition.items()
+        }
+        for name, rendition in images['renditions'].items()
+    })
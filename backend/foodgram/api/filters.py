@@ -1,18 +1,46 @@
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Upper
 from django_filters.rest_framework import FilterSet, filters
 
 from recipes.models import Ingredient, Recipe, Tag
 
 
+RECIPE_ORDERINGS = {
+    '-pub_date': ('-pub_date', '-id'),
+    'popular': ('-favorites_count', '-id'),
+    'trending': ('-popularity', '-id'),
+    'cooking_time': ('cooking_time', 'id'),
+    '-cooking_time': ('-cooking_time', '-id'),
+}
+
+
+def get_recipe_ordering(value):
+    return RECIPE_ORDERINGS.get(value, RECIPE_ORDERINGS['-pub_date'])
+
+
+def rank_by_prefix(queryset, value, *ordering):
+    return queryset.annotate(
+        prefix_rank=Case(
+            When(name__istartswith=value, then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField()
+        )
+    ).order_by('prefix_rank', *ordering)
+
+
 class IngredientFilter(FilterSet):
-    name = filters.CharFilter(
-        field_name='name',
-        lookup_expr='istartswith'
-    )
+    name = filters.CharFilter(method='filter_name')
 
     class Meta:
         model = Ingredient
         fields = ('name',)
 
+    def filter_name(self, queryset, name, value):
+        return rank_by_prefix(
+            queryset.filter(name__icontains=value), value, 'name'
+        )
+
 
 class RecipeFilter(FilterSet):
     tags = filters.ModelMultipleChoiceFilter(
@@ -22,10 +50,18 @@ class RecipeFilter(FilterSet):
     )
     is_favorited = filters.BooleanFilter(method='get_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(method='get_is_in_basket')
+    search = filters.CharFilter(method='search_recipes')
+    ordering = filters.ChoiceFilter(
+        choices=[(value, value) for value in RECIPE_ORDERINGS],
+        method='order_recipes'
+    )
 
     class Meta:
         model = Recipe
-        fields = ('author', 'tags', 'is_favorited', 'is_in_shopping_cart')
+        fields = (
+            'author', 'tags', 'is_favorited', 'is_in_shopping_cart', 'search',
+            'ordering'
+        )
 
     def get_is_favorited(self, queryset, name, value):
         user = self.request.user
@@ -38,3 +74,21 @@ class RecipeFilter(FilterSet):
         if value and user.is_authenticated:
             return queryset.filter(basket_list__user=user)
         return queryset
+
+    def search_recipes(self, queryset, name, value):
+        if connection.vendor != 'postgresql':
+            return rank_by_prefix(
+                queryset.filter(name__icontains=value), value, '-pub_date'
+            )
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        return queryset.annotate(
+            search_name=Upper('name'),
+            similarity=TrigramSimilarity(Upper('name'), value.upper())
+        ).filter(
+            Q(search_name__trigram_similar=value.upper())
+            | Q(name__icontains=value)
+        ).order_by('-similarity', '-pub_date')
+
+    def order_recipes(self, queryset, name, value):
+        return queryset.order_by(*get_recipe_ordering(value))
@@ -0,0 +1,48 @@
+from recipes.models import Basket, Favorite
+from users.models import Follow
+
+VIEWER_STATE_SOURCES = {
+    'subscriptions': (Follow, 'author_id'),
+    'favorites': (Favorite, 'recipes_id'),
+    'baskets': (Basket, 'recipes_id'),
+}
+
+
+class ViewerState:
+
+    def __init__(self, user):
+        self.user = user
+        self.pending = {kind: set() for kind in VIEWER_STATE_SOURCES}
+        self.loaded = {kind: {} for kind in VIEWER_STATE_SOURCES}
+
+    def prime(self, kind, ids):
+        self.pending[kind].update(
+            pk for pk in ids if pk not in self.loaded[kind]
+        )
+
+    def get(self, kind, pk):
+        if not self.user.is_authenticated:
+            return False
+        if pk not in self.loaded[kind]:
+            self.pending[kind].add(pk)
+            self.load(kind)
+        return self.loaded[kind][pk]
+
+    def load(self, kind):
+        model, field = VIEWER_STATE_SOURCES[kind]
+        ids, self.pending[kind] = self.pending[kind], set()
+        found = set(model.objects.filter(
+            user=self.user, **{f'{field}__in': ids}
+        ).values_list(field, flat=True))
+        self.loaded[kind].update((pk, pk in found) for pk in ids)
+
+
+def get_viewer_state(context):
+    request = context.get('request')
+    if request is None:
+        return None
+    state = getattr(request, 'viewer_state', None)
+    if state is None or state.user != request.user:
+        state = ViewerState(request.user)
+        request.viewer_state = state
+    return state
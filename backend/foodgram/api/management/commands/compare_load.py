@@ -0,0 +1,87 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = (
+    'api/recipes/',
+    'api/recipes/?ordering=popular',
+    'api/ingredients/?name=мо',
+    'api/tags/',
+)
+
+
+def percentile(values, share):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+class Command(BaseCommand):
+    help = ('Нагружает синхронный (WSGI) и асинхронный (ASGI) серверы '
+            'одинаковыми запросами и сравнивает rps и задержки')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync', default='http://localhost:8000/',
+                            help='адрес WSGI-сервера')
+        parser.add_argument('--async', dest='async_url',
+                            default='http://localhost:8001/',
+                            help='адрес ASGI-сервера')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='путь запроса, можно указать несколько раз')
+        parser.add_argument('--requests', type=int, default=500,
+                            help='запросов на каждый сервер')
+        parser.add_argument('--concurrency', type=int, default=20,
+                            help='одновременных клиентов')
+        parser.add_argument('--token', help='токен для авторизации')
+
+    def run(self, base_url, paths, options):
+        local = threading.local()
+        headers = {}
+        if options['token']:
+            headers['Authorization'] = f'Token {options["token"]}'
+
+        def fetch(path):
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+                local.session.headers.update(headers)
+            started = time.perf_counter()
+            try:
+                status = local.session.get(base_url + path).status_code
+            except requests.RequestException:
+                status = None
+            return status, time.perf_counter() - started
+
+        urls = list(islice(cycle(paths), options['requests']))
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            list(executor.map(fetch, paths))
+            started = time.perf_counter()
+            results = list(executor.map(fetch, urls))
+            elapsed = time.perf_counter() - started
+        latencies = [latency for _, latency in results]
+        return {
+            'rps': len(results) / elapsed,
+            'p50': percentile(latencies, 0.5) * 1000,
+            'p99': percentile(latencies, 0.99) * 1000,
+            'errors': sum(status != 200 for status, _ in results),
+        }
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('Число запросов и клиентов должно быть > 0')
+        paths = options['paths'] or DEFAULT_PATHS
+        self.stdout.write(
+            f'{"сервер":<8}{"rps":>10}{"p50, мс":>10}{"p99, мс":>10}'
+            f'{"ошибки":>8}'
+        )
+        for name, url in (('sync', options['sync']),
+                          ('async', options['async_url'])):
+            result = self.run(url.rstrip('/') + '/', paths, options)
+            self.stdout.write(
+                f'{name:<8}{result["rps"]:>10.1f}{result["p50"]:>10.1f}'
+                f'{result["p99"]:>10.1f}{result["errors"]:>8}'
+            )
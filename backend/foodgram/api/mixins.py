@@ -1,6 +1,9 @@
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
 from rest_framework.viewsets import GenericViewSet
 
+from api.cache import ResponseCacheMixin
 
-class CustomMixin(ListModelMixin, RetrieveModelMixin, GenericViewSet):
+
+class CustomMixin(ResponseCacheMixin, ListModelMixin, RetrieveModelMixin,
+                  GenericViewSet):
     pass
@@ -1,6 +1,203 @@
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from functools import partial, reduce
+from hashlib import md5
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from api.cache import get_version
+
+
+MAX_CURSOR_INT = 2 ** 63 - 1
 
 
 class Pagntr(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    cursor_count_query_param = 'with_count'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.ordering = getattr(view, 'cursor_ordering', ('-id',))
+        self.count = None
+        if request.query_params.get(self.cursor_count_query_param):
+            self.count = self.get_count(queryset)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(position))
+        page_size = self.get_page_size(request)
+        page = list(queryset.order_by(*self.ordering)[:page_size + 1])
+        self.next_position = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_position = self.get_position(page[-1])
+        return page
+
+    def get_count(self, queryset):
+        return queryset.count()
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_cursor_link()
+        response['previous'] = None
+        response['results'] = data
+        return Response(response)
+
+    def get_fields(self):
+        return [
+            (field.lstrip('-'), field.startswith('-'))
+            for field in self.ordering
+        ]
+
+    def get_position(self, instance):
+        position = []
+        for field, _ in self.get_fields():
+            value = getattr(instance, field)
+            position.append(
+                value.isoformat() if hasattr(value, 'isoformat') else value
+            )
+        return position
+
+    def keyset_filter(self, position):
+        conditions = []
+        equal = Q()
+        for (field, descending), value in zip(self.get_fields(), position):
+            lookup = 'lt' if descending else 'gt'
+            conditions.append(equal & Q(**{f'{field}__{lookup}': value}))
+            equal &= Q(**{field: value})
+        return reduce(or_, conditions)
+
+    def decode_cursor(self, request, model):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            position = json.loads(b64decode(cursor.encode('ascii')))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                self.parse_cursor_value(model, field, value)
+                for (field, _), value in zip(self.get_fields(), position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def parse_cursor_value(model, field, value):
+        if (value is None or isinstance(value, (list, dict))
+                or isinstance(value, int) and abs(value) > MAX_CURSOR_INT):
+            raise ValueError(value)
+        model_field = model._meta.get_field(field)
+        value = model_field.to_python(value)
+        model_field.run_validators(value)
+        return value
+
+    def get_next_cursor_link(self):
+        if self.next_position is None:
+            return None
+        cursor = b64encode(
+            json.dumps(self.next_position).encode('utf-8')
+        ).decode('ascii')
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, cursor
+        )
+
+
+RECIPE_COUNT_VERSION_KEY = 'recipe_count_version'
+USER_COUNT_VERSION_KEY = 'recipe_count_version:{user_id}'
+
+
+def estimate_count(queryset):
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CachedCountPaginator(Paginator):
+
+    def __init__(self, *args, cache_key=None, estimate=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+        self.estimate = estimate
+
+    @cached_property
+    def count(self):
+        count = cache.get(self.cache_key)
+        if count is not None:
+            return count
+        if self.estimate:
+            count = estimate_count(self.object_list)
+            if count is not None and count < settings.COUNT_ESTIMATE_MIN:
+                count = None
+        if count is None:
+            count = self.object_list.count()
+        cache.set(self.cache_key, count, settings.COUNT_CACHE_TIMEOUT)
+        return count
+
+
+class CachedCountPagntr(Pagntr):
+    user_scoped_params = ('is_favorited', 'is_in_shopping_cart')
+    ignored_params = ('page', 'limit', 'cursor', 'with_count')
+
+    def get_count_key(self, request):
+        params = sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            if key not in self.ignored_params
+            for value in values
+        )
+        scope = 'all'
+        if request.user.is_authenticated and any(
+            key in self.user_scoped_params for key, _ in params
+        ):
+            scope = '{}:{}'.format(request.user.id, get_version(
+                USER_COUNT_VERSION_KEY.format(user_id=request.user.id)
+            ))
+        return 'recipe_count:{}:{}:{}'.format(
+            get_version(RECIPE_COUNT_VERSION_KEY),
+            scope,
+            md5(urlencode(params).encode('utf-8')).hexdigest()
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            cache_key=self.get_count_key(request),
+            estimate=not request.user.is_authenticated
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset):
+        return self.django_paginator_class(queryset, 1).count
@@ -0,0 +1,114 @@
+import csv
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFError, TTFont
+from reportlab.pdfgen import canvas
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer
+
+SHOPPING_LIST_TITLE = 'Список покупок:'
+SHOPPING_LIST_HEADER = ('Ингредиент', 'Количество', 'Единица измерения')
+
+logger = logging.getLogger(__name__)
+
+
+class ShoppingListNegotiation(DefaultContentNegotiation):
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        try:
+            return super().select_renderer(request, renderers, format_suffix)
+        except NotAcceptable:
+            return renderers[0], renderers[0].media_type
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+class ShoppingListRenderer(BaseRenderer):
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = '\n'.join(f'{key}: {value}' for key, value in data.items())
+        return str(data).encode('utf-8')
+
+    def stream(self, rows):
+        yield f'{SHOPPING_LIST_TITLE}\n'
+        for name, measurement_unit, amount in rows:
+            yield f'{name}: {amount} {measurement_unit}\n'
+
+
+class TextShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+
+class CSVShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(SHOPPING_LIST_HEADER)
+        for name, measurement_unit, amount in rows:
+            yield writer.writerow((name, amount, measurement_unit))
+
+
+class PDFShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+    font_size = 12
+    line_height = 18
+    margin = 50
+    chunk_size = 64 * 1024
+
+    @staticmethod
+    def get_font():
+        try:
+            pdfmetrics.getFont(settings.PDF_FONT_NAME)
+        except KeyError:
+            try:
+                pdfmetrics.registerFont(
+                    TTFont(settings.PDF_FONT_NAME, settings.PDF_FONT_PATH)
+                )
+            except (TTFError, OSError) as error:
+                logger.error(
+                    'Не удалось загрузить шрифт %s: %s',
+                    settings.PDF_FONT_PATH, error
+                )
+                raise ImproperlyConfigured(
+                    f'Шрифт для PDF не загружен: {settings.PDF_FONT_PATH}'
+                ) from error
+        return settings.PDF_FONT_NAME
+
+    def stream(self, rows):
+        # the font is loaded before the response starts streaming
+        return self.write_pdf(rows, self.get_font())
+
+    def write_pdf(self, rows, font):
+        buffer = BytesIO()
+        pdf = canvas.Canvas(buffer)
+        width, height = pdf._pagesize
+        pdf.setFont(font, self.font_size)
+        y = height - self.margin
+        pdf.drawString(self.margin, y, SHOPPING_LIST_TITLE)
+        for name, measurement_unit, amount in rows:
+            y -= self.line_height
+            if y < self.margin:
+                pdf.showPage()
+                pdf.setFont(font, self.font_size)
+                y = height - self.margin
+            pdf.drawString(
+                self.margin, y, f'{name}: {amount} {measurement_unit}'
+            )
+        pdf.save()
+        buffer.seek(0)
+        yield from iter(lambda: buffer.read(self.chunk_size), b'')
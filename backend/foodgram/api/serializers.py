@@ -1,25 +1,64 @@
-from django.shortcuts import get_object_or_404
+import os
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from djoser.serializers import UserSerializer, UserCreateSerializer
 from rest_framework.serializers import (
+    ListSerializer,
     ModelSerializer,
     ValidationError,
     PrimaryKeyRelatedField,
     ReadOnlyField,
     SerializerMethodField,
-    IntegerField
+    IntegerField,
+    ListField,
+    Serializer,
+    UUIDField
 )
 from rest_framework.validators import UniqueTogetherValidator
 from drf_extra_fields.fields import Base64ImageField
 
+from api.fields import (
+    ImageRenditionsField,
+    RecipeImageField,
+    absolute_images
+)
+
 from recipes.models import (
     Recipe,
     Tag,
     Ingredient,
     Basket,
     Favorite,
-    IngredientInRecipe
+    IngredientInRecipe,
+    ImageUpload,
+    get_recipe_prefetches
 )
-from users.models import User, Follow
+from recipes.signals import recipe_changed
+from recipes.storage import content_digest
+from users.models import User, Follow, get_user_stats
+from api.cache import get_recipe_cards
+from api.loaders import get_viewer_state
+
+MAX_RECIPES_LIMIT = 2 ** 31 - 1
+
+
+def is_same_file(old, new):
+    if not old or old.name == new.name:
+        return bool(old)
+    name = old.field.generate_filename(
+        old.instance, os.path.basename(new.name)
+    )
+    return old.storage.digest_name(name, content_digest(new)) == old.name
+
+
+def get_recipes_limit(request):
+    recipes_limit = request.query_params.get('recipes_limit', '')
+    if not recipes_limit.isdecimal():
+        return None
+    return min(int(recipes_limit), MAX_RECIPES_LIMIT)
 
 
 class CustomUserCreateSerializer(UserCreateSerializer):
@@ -66,24 +105,31 @@ class FollowSerializer(ModelSerializer):
         return data
 
     def get_is_subscribed(self, obj):
-        request = self.context.get('request').user
-        if request.is_authenticated:
-            return Follow.objects.filter(
-                user=request,
-                author=obj.id
-            ).exists()
-        return False
+        return True
 
     def get_recipes(self, obj):
-        recipes_limit = (
-            self.context.get('request').query_params.get('recipes_limit'))
-        queryset = (obj.author.recipes.all()[:int(recipes_limit)]
-                    if recipes_limit
+        if hasattr(obj.author, 'limited_recipes'):
+            return RecipeForListSerializer(
+                obj.author.limited_recipes, many=True
+            ).data
+        recipes_limit = get_recipes_limit(self.context.get('request'))
+        queryset = (obj.author.recipes.all()[:recipes_limit]
+                    if recipes_limit is not None
                     else obj.author.recipes.all())
         return RecipeForListSerializer(queryset, many=True).data
 
     def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj.author).count()
+        return get_user_stats(obj.author).recipes_count
+
+
+class CustomUserListSerializer(ListSerializer):
+
+    def to_representation(self, data):
+        users = list(data.all() if hasattr(data, 'all') else data)
+        state = get_viewer_state(self.context)
+        if state is not None:
+            state.prime('subscriptions', [user.pk for user in users])
+        return super().to_representation(users)
 
 
 class CustomUserSerializer(UserSerializer):
@@ -99,15 +145,11 @@ class CustomUserSerializer(UserSerializer):
             'last_name',
             'is_subscribed'
         )
+        list_serializer_class = CustomUserListSerializer
 
     def get_is_subscribed(self, obj):
-        request = self.context.get('request').user
-        if request.is_authenticated:
-            return Follow.objects.filter(
-                user=request,
-                author=obj.id
-            ).exists()
-        return False
+        state = get_viewer_state(self.context)
+        return state is not None and state.get('subscriptions', obj.pk)
 
 
 class TagSerializer(ModelSerializer):
@@ -130,7 +172,7 @@ class IngredientSerializer(ModelSerializer):
 
 
 class ReadIngredientSerializer(ModelSerializer):
-    id = PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = IntegerField()
 
     class Meta:
         model = IngredientInRecipe
@@ -149,18 +191,74 @@ class IngredientInRecipeSerializer(ModelSerializer):
 
 class RecipeForListSerializer(ModelSerializer):
     image = Base64ImageField()
+    images = ImageRenditionsField()
+
+    class Meta:
+        model = Recipe
+        fields = (
+            'id',
+            'name',
+            'image',
+            'images',
+            'tags',
+            'cooking_time',
+        )
+
+
+class RecipeAuthorSerializer(ModelSerializer):
+    class Meta:
+        model = User
+        fields = (
+            'id',
+            'email',
+            'username',
+            'first_name',
+            'last_name',
+        )
+
+
+class RecipeCardSerializer(ModelSerializer):
+    tags = TagSerializer(many=True, read_only=True)
+    author = RecipeAuthorSerializer(read_only=True)
+    ingredients = IngredientInRecipeSerializer(
+        many=True, source='recipe_ingredients')
+    image = Base64ImageField()
+    images = ImageRenditionsField()
 
     class Meta:
         model = Recipe
         fields = (
             'id',
+            'author',
             'name',
             'image',
+            'images',
+            'text',
+            'ingredients',
             'tags',
             'cooking_time',
         )
 
 
+class RecipeCardListSerializer(ListSerializer):
+
+    def to_representation(self, data):
+        recipes = list(data.all() if hasattr(data, 'all') else data)
+        state = get_viewer_state(self.context)
+        if state is not None:
+            pks = [recipe.pk for recipe in recipes]
+            state.prime('favorites', pks)
+            state.prime('baskets', pks)
+            state.prime(
+                'subscriptions', [recipe.author_id for recipe in recipes]
+            )
+        cards = get_recipe_cards(recipes, self.child.build_cards)
+        return [
+            self.child.add_viewer_state(card, recipe)
+            for card, recipe in zip(cards, recipes)
+        ]
+
+
 class ReadRecipeSerializer(ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
     author = CustomUserSerializer(read_only=True)
@@ -169,6 +267,7 @@ class ReadRecipeSerializer(ModelSerializer):
     is_favorited = SerializerMethodField()
     is_in_shopping_cart = SerializerMethodField()
     image = Base64ImageField()
+    images = ImageRenditionsField()
 
     class Meta:
         model = Recipe
@@ -177,6 +276,7 @@ class ReadRecipeSerializer(ModelSerializer):
             'author',
             'name',
             'image',
+            'images',
             'text',
             'ingredients',
             'tags',
@@ -190,18 +290,50 @@ class ReadRecipeSerializer(ModelSerializer):
             'author',
             'tags',
         )
+        list_serializer_class = RecipeCardListSerializer
+
+    def get_viewer_flag(self, kind, pk):
+        state = get_viewer_state(self.context)
+        return state is not None and state.get(kind, pk)
 
     def get_is_favorited(self, obj):
-        request = self.context.get('request')
-        if request.user.is_authenticated:
-            return obj.favorite_list.filter(user=request.user).exists()
-        return False
+        return self.get_viewer_flag('favorites', obj.pk)
 
     def get_is_in_shopping_cart(self, obj):
+        return self.get_viewer_flag('baskets', obj.pk)
+
+    def get_author_is_subscribed(self, obj):
+        return self.get_viewer_flag('subscriptions', obj.author_id)
+
+    def build_cards(self, instances):
+        prefetch_related_objects(instances, *get_recipe_prefetches())
+        # cached cards keep storage-relative urls, the host is per request
+        context = {
+            key: value for key, value in self.context.items()
+            if key != 'request'
+        }
+        return RecipeCardSerializer(
+            instances, many=True, context=context
+        ).data
+
+    def add_viewer_state(self, card, instance):
+        data = OrderedDict(card)
+        data['author'] = OrderedDict(card['author'])
+        data['author']['is_subscribed'] = self.get_author_is_subscribed(
+            instance
+        )
+        data['is_favorited'] = self.get_is_favorited(instance)
+        data['is_in_shopping_cart'] = self.get_is_in_shopping_cart(instance)
         request = self.context.get('request')
-        if request.user.is_authenticated:
-            return obj.basket_list.filter(user=request.user).exists()
-        return False
+        if request is not None:
+            if card['image']:
+                data['image'] = request.build_absolute_uri(card['image'])
+            data['images'] = absolute_images(card['images'], request)
+        return data
+
+    def to_representation(self, instance):
+        card, = get_recipe_cards([instance], self.build_cards)
+        return self.add_viewer_state(card, instance)
 
     def get_ingredients(self, obj):
         ingredients = IngredientInRecipe.objects.filter(recipe=obj)
@@ -211,7 +343,8 @@ class ReadRecipeSerializer(ModelSerializer):
 class CreatRecipeSerializer(ModelSerializer):
     tags = PrimaryKeyRelatedField(many=True, queryset=Tag.objects.all())
     ingredients = ReadIngredientSerializer(many=True)
-    image = Base64ImageField()
+    image = RecipeImageField(required=False)
+    image_token = UUIDField(write_only=True, required=False)
     cooking_time = IntegerField()
 
     class Meta:
@@ -220,57 +353,167 @@ class CreatRecipeSerializer(ModelSerializer):
             'id',
             'name',
             'image',
+            'image_token',
             'text',
             'ingredients',
             'tags',
             'cooking_time'
         )
 
-    def validate(self, data):
-        tags = self.initial_data.get('tags')
-        ingredients = self.initial_data.get('ingredients')
+    def validate_ingredients(self, value):
+        amounts = {}
+        for ingredient in value:
+            amounts[ingredient['id']] = (
+                amounts.get(ingredient['id'], 0) + ingredient['amount']
+            )
+        too_large = [
+            str(pk) for pk, amount in amounts.items()
+            if amount > settings.MAX_AMOUNT
+        ]
+        if too_large:
+            raise ValidationError(
+                f'Суммарное количество больше {settings.MAX_AMOUNT}: '
+                f'{", ".join(too_large)}.'
+            )
+        ingredients = Ingredient.objects.in_bulk(list(amounts))
+        missing = [str(pk) for pk in amounts if pk not in ingredients]
+        if missing:
+            raise ValidationError(
+                f'Ингредиенты не найдены: {", ".join(missing)}.'
+            )
+        return [
+            {'ingredient': ingredients[pk], 'amount': amount}
+            for pk, amount in amounts.items()
+        ]
 
-        if not ingredients:
+    def validate(self, data):
+        if not data.get('ingredients'):
             raise ValidationError('Выберите ингердиенты.')
-        if not tags:
+        if not data.get('tags'):
             raise ValidationError('Выберите хотя бы один тег.')
-
-        data.update(
-            {
-                'tags': tags,
-                'ingredients': ingredients,
-                'author': self.context.get('request').user,
-            }
-        )
+        user = self.context.get('request').user
+        image_token = data.pop('image_token', None)
+        if image_token is not None:
+            self.image_upload = ImageUpload.objects.filter(
+                token=image_token, user=user
+            ).first()
+            if self.image_upload is None:
+                raise ValidationError({'image_token': 'Загрузка не найдена.'})
+            data['image'] = self.image_upload.file
+        if self.instance is None and not data.get('image'):
+            raise ValidationError('Добавьте картинку.')
+        data['author'] = user
         return data
 
+    def consume_image_upload(self):
+        if getattr(self, 'image_upload', None) is not None:
+            self.image_upload.delete()
+
     @staticmethod
     def create_ingredients(ingredients, recipe):
-        ingredient_list = []
-        for ingredient in ingredients:
-            ingredient_list.append(IngredientInRecipe(
-                ingredient=get_object_or_404(Ingredient, id=ingredient['id']),
+        IngredientInRecipe.objects.bulk_create([
+            IngredientInRecipe(
+                ingredient=ingredient['ingredient'],
                 recipe=recipe,
                 amount=ingredient['amount']
-            ))
-        IngredientInRecipe.objects.bulk_create(ingredient_list)
+            )
+            for ingredient in ingredients
+        ])
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
         self.create_ingredients(ingredients, recipe)
+        self.consume_image_upload()
         return recipe
 
+    @staticmethod
+    def update_fields(instance, validated_data):
+        if 'image' in validated_data and is_same_file(
+            instance.image, validated_data['image']
+        ):
+            del validated_data['image']
+        changed = [
+            attr for attr, value in validated_data.items()
+            if getattr(instance, attr) != value
+        ]
+        for attr in changed:
+            setattr(instance, attr, validated_data[attr])
+        if changed:
+            instance.save(update_fields=changed)
+        return changed
+
+    @staticmethod
+    def update_ingredients(instance, ingredients):
+        current = {
+            row.ingredient_id: row
+            for row in instance.recipe_ingredients.all()
+        }
+        new = {
+            ingredient['ingredient'].id: ingredient
+            for ingredient in ingredients
+        }
+        added = [
+            IngredientInRecipe(
+                recipe=instance,
+                ingredient=ingredient['ingredient'],
+                amount=ingredient['amount']
+            )
+            for pk, ingredient in new.items() if pk not in current
+        ]
+        removed = [pk for pk in current if pk not in new]
+        amounts = {row.ingredient_id: row.amount for row in added}
+        amounts.update({pk: -current[pk].amount for pk in removed})
+        changed = []
+        for pk, row in current.items():
+            if pk in new and row.amount != new[pk]['amount']:
+                amounts[pk] = new[pk]['amount'] - row.amount
+                row.amount = new[pk]['amount']
+                changed.append(row)
+        IngredientInRecipe.objects.bulk_create(added)
+        IngredientInRecipe.objects.bulk_update(changed, ('amount',))
+        if removed:
+            instance.recipe_ingredients.filter(
+                ingredient_id__in=removed
+            ).delete()
+        return {
+            'added': [row.ingredient_id for row in added],
+            'changed': [row.ingredient_id for row in changed],
+            'removed': removed,
+            'amounts': amounts,
+        }
+
+    @staticmethod
+    def update_tags(instance, tags):
+        current = set(instance.tags.values_list('pk', flat=True))
+        new = {tag.pk for tag in tags}
+        added = new - current
+        removed = current - new
+        if added:
+            instance.tags.add(*added)
+        if removed:
+            instance.tags.remove(*removed)
+        return {'added': sorted(added), 'removed': sorted(removed)}
+
+    @transaction.atomic
     def update(self, instance, validated_data):
-        instance.ingredients.clear()
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
-        instance.tags.clear()
-        instance.tags.set(tags)
-        self.create_ingredients(ingredients, instance)
-        instance.save()
+        validated_data.pop('author', None)
+        self.changes = {
+            'fields': self.update_fields(instance, validated_data),
+            'ingredients': self.update_ingredients(instance, ingredients),
+            'tags': self.update_tags(instance, tags),
+        }
+        self.consume_image_upload()
+        if (self.changes['fields'] or self.changes['ingredients']['amounts']
+                or any(self.changes['tags'].values())):
+            recipe_changed.send(
+                sender=Recipe, instance=instance, changes=self.changes
+            )
         return instance
 
     def to_representation(self, instance):
@@ -301,3 +544,11 @@ class ReadFavoriteSerializer(ModelSerializer):
             instance.recipes,
             context={'request': self.context.get('request')}
         ).data
+
+
+class BulkIdsSerializer(Serializer):
+    ids = ListField(
+        child=IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BULK_MAX_IDS
+    )
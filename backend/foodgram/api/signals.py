@@ -0,0 +1,159 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save
+)
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.authentication import token_cache
+
+from api.cache import (
+    bump_version,
+    invalidate_recipe_cards,
+    invalidate_responses
+)
+from api.paginator import RECIPE_COUNT_VERSION_KEY, USER_COUNT_VERSION_KEY
+from recipes.models import (
+    Basket,
+    Favorite,
+    Ingredient,
+    IngredientInRecipe,
+    Recipe,
+    RecipeImageTask,
+    Tag
+)
+from recipes.signals import data_imported, links_changed, recipe_changed
+from users.models import User
+
+AUTHOR_CARD_FIELDS = ('email', 'username', 'first_name', 'last_name')
+
+
+def after_commit(function, *args):
+    transaction.on_commit(lambda: function(*args))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(data_imported, sender=Recipe)
+def invalidate_recipe_counts(sender, **kwargs):
+    if kwargs.get('created', True):
+        after_commit(bump_version, RECIPE_COUNT_VERSION_KEY)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=Basket)
+@receiver(post_delete, sender=Basket)
+def invalidate_user_recipe_counts(sender, instance, **kwargs):
+    after_commit(
+        bump_version,
+        USER_COUNT_VERSION_KEY.format(user_id=instance.user_id)
+    )
+
+
+@receiver(links_changed, sender=Favorite)
+@receiver(links_changed, sender=Basket)
+def invalidate_linked_recipe_counts(sender, user_id, **kwargs):
+    after_commit(bump_version, USER_COUNT_VERSION_KEY.format(user_id=user_id))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(data_imported, sender=Tag)
+def invalidate_tag_responses(sender, **kwargs):
+    after_commit(invalidate_responses, 'tags', 'recipes')
+    after_commit(invalidate_recipe_cards)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(data_imported, sender=Ingredient)
+def invalidate_ingredient_responses(sender, **kwargs):
+    after_commit(invalidate_responses, 'ingredients', 'recipes')
+    after_commit(invalidate_recipe_cards)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(post_save, sender=IngredientInRecipe)
+@receiver(post_delete, sender=IngredientInRecipe)
+@receiver(data_imported, sender=Recipe)
+def invalidate_recipe_responses(sender, **kwargs):
+    after_commit(invalidate_responses, 'recipes')
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_card(sender, instance, **kwargs):
+    after_commit(invalidate_recipe_cards, [instance.pk])
+
+
+@receiver(post_save, sender=IngredientInRecipe)
+@receiver(post_delete, sender=IngredientInRecipe)
+def invalidate_recipe_card_ingredients(sender, instance, **kwargs):
+    after_commit(invalidate_recipe_cards, [instance.recipe_id])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_card_tags(sender, instance, reverse, pk_set,
+                                **kwargs):
+    if not reverse:
+        after_commit(invalidate_recipe_cards, [instance.pk])
+    elif pk_set:
+        after_commit(invalidate_recipe_cards, set(pk_set))
+    else:
+        after_commit(invalidate_recipe_cards)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    token_cache.invalidate(*Token.objects.filter(
+        user=instance
+    ).values_list('key', flat=True))
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+
+
+def get_author_card(user):
+    return tuple(user.__dict__.get(field) for field in AUTHOR_CARD_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_author_card(sender, instance, **kwargs):
+    instance._author_card = get_author_card(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_responses(sender, instance, created, **kwargs):
+    card = get_author_card(instance)
+    if created or card == instance._author_card:
+        return
+    instance._author_card = card
+    after_commit(invalidate_responses, 'recipes')
+    after_commit(
+        invalidate_recipe_cards,
+        list(instance.recipes.values_list('pk', flat=True))
+    )
+
+
+@receiver(recipe_changed, sender=Recipe)
+def invalidate_changed_recipe(sender, instance, **kwargs):
+    after_commit(invalidate_responses, 'recipes')
+    after_commit(invalidate_recipe_cards, [instance.pk])
+
+
+@receiver(post_save, sender=RecipeImageTask)
+def invalidate_recipe_images(sender, instance, **kwargs):
+    if instance.status == RecipeImageTask.DONE:
+        after_commit(invalidate_responses, 'recipes')
+        after_commit(invalidate_recipe_cards, [instance.recipe_id])
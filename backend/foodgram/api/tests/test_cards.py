@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from recipes.models import Recipe, RecipeImageRendition
+from users.models import User
+
+
+@override_settings(ALLOWED_HOSTS=['*'])
+class RecipeCardUrlTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        cls.recipe = Recipe.objects.create(
+            author=author, name='Рецепт', text='Текст', cooking_time=10,
+            image='recipes/images/test.png'
+        )
+        RecipeImageRendition.objects.create(
+            recipe=cls.recipe, name='small', format='webp',
+            file='recipes/renditions/small.webp', width=320, height=240
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_card(self, host):
+        response = self.client.get(
+            f'/api/recipes/{self.recipe.pk}/', HTTP_HOST=host
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_cached_card_urls_follow_request_host(self):
+        self.get_card('first.example')
+        card = self.get_card('second.example')
+        self.assertEqual(
+            card['image'],
+            'http://second.example/media/recipes/images/test.png'
+        )
+        url = 'http://second.example/media/recipes/renditions/small.webp'
+        self.assertEqual(card['images'], {
+            'renditions': {
+                'small': {'width': 320, 'height': 240, 'webp': url},
+            },
+            'srcset': {'webp': f'{url} 320w'},
+        })
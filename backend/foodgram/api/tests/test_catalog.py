@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from recipes.catalog import export_catalog
+from recipes.models import Recipe
+from users.models import User
+
+
+class ExportCatalogTest(TestCase):
+
+    def test_export_writes_to_command_stdout(self):
+        User.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        out = StringIO()
+        call_command('export_catalog', stdout=out, stderr=StringIO())
+        self.assertEqual(
+            [json.loads(line) for line in out.getvalue().splitlines()],
+            [{
+                'type': 'user', 'username': 'author',
+                'email': 'author@example.com', 'first_name': '',
+                'last_name': '',
+                'password': User.objects.get().password,
+                'is_active': True, 'is_staff': False, 'is_superuser': False,
+            }]
+        )
+
+
+@skipUnless(connection.vendor == 'postgresql', 'нужен PostgreSQL')
+class CatalogCopyTest(TestCase):
+
+    def test_round_trip_keeps_empty_strings(self):
+        author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        Recipe.objects.create(
+            author=author, name='Пустой', text='', cooking_time=5, image=''
+        )
+        Recipe.objects.create(
+            author=author, name='Полный', text='Текст, "с кавычками"',
+            cooking_time=10, image='recipes/images/test.png'
+        )
+        handle, path = tempfile.mkstemp(suffix='.ndjson')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w', encoding='utf-8') as stream:
+            export_catalog(stream, 100)
+        Recipe.objects.all().delete()
+        call_command('import_catalog', path, stdout=StringIO())
+        self.assertEqual(
+            set(Recipe.objects.values_list('name', 'text', 'image')),
+            {
+                ('Пустой', '', ''),
+                ('Полный', 'Текст, "с кавычками"', 'recipes/images/test.png'),
+            }
+        )
@@ -0,0 +1,56 @@
+from django.test import SimpleTestCase, override_settings
+
+from api.checks import (
+    pdf_font_check,
+    shared_cache_check,
+    token_cache_check
+)
+
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/tmp/foodgram-test-cache',
+    },
+}
+LOCAL_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+
+
+@override_settings(DEBUG=False)
+class SharedCacheCheckTest(SimpleTestCase):
+
+    def get_ids(self):
+        return [
+            error.id
+            for check in (shared_cache_check, token_cache_check)
+            for error in check(None)
+        ]
+
+    @override_settings(CACHES=SHARED_CACHES, TOKEN_CACHE_ALIAS='default')
+    def test_shared_caches_pass(self):
+        self.assertEqual(self.get_ids(), [])
+
+    @override_settings(CACHES=SHARED_CACHES, TOKEN_CACHE_ALIAS='')
+    def test_local_token_store_is_rejected(self):
+        self.assertEqual(self.get_ids(), ['api.E002'])
+
+    @override_settings(CACHES=LOCAL_CACHES, TOKEN_CACHE_ALIAS='default')
+    def test_local_default_cache_is_rejected(self):
+        self.assertEqual(self.get_ids(), ['api.E001', 'api.E002'])
+
+    @override_settings(
+        CACHES=LOCAL_CACHES, TOKEN_CACHE_ALIAS='', DEBUG=True
+    )
+    def test_debug_allows_local_caches(self):
+        self.assertEqual(self.get_ids(), [])
+
+
+class PDFFontCheckTest(SimpleTestCase):
+
+    @override_settings(PDF_FONT_NAME='MissingFont',
+                       PDF_FONT_PATH='/nonexistent/font.ttf')
+    def test_missing_font_is_reported(self):
+        with self.assertLogs('api.renderers', 'ERROR'):
+            errors = pdf_font_check(None)
+        self.assertEqual([error.id for error in errors], ['api.E003'])
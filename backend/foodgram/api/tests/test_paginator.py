@@ -0,0 +1,39 @@
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from api.paginator import estimate_count
+from recipes.models import Recipe
+from users.models import User
+
+
+@skipUnless(connection.vendor == 'postgresql', 'нужен PostgreSQL')
+class EstimateCountTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=author, name=f'Рецепт {index}', text='Текст',
+                cooking_time=10, image='recipes/images/test.png'
+            )
+            for index in range(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_estimate_count_reads_plan_rows(self):
+        self.assertIsInstance(estimate_count(Recipe.objects.all()), int)
+
+    @override_settings(COUNT_ESTIMATE_MIN=0)
+    def test_anonymous_list_uses_estimate(self):
+        response = self.client.get('/api/recipes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data['count'], int)
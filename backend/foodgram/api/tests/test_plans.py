@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+
+from api.filters import RecipeFilter
+from recipes.models import Basket, Favorite, Recipe, Tag
+from users.models import User
+
+
+@skipUnless(connection.vendor == 'postgresql', 'нужен PostgreSQL')
+class RecipeFeedPlanTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='reader', email='reader@example.com', password='pass'
+        )
+        cls.tag = Tag.objects.create(name='Тег', color='#000000', slug='tag')
+        recipe = Recipe.objects.create(
+            author=cls.user, name='Рецепт', text='Текст', cooking_time=10,
+            image='recipes/images/test.png'
+        )
+        recipe.tags.add(cls.tag)
+
+    def setUp(self):
+        # on a nearly empty table the planner prefers sequential scans
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+
+    @staticmethod
+    def get_index_names(model, columns):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, model._meta.db_table
+            )
+        return [
+            name for name, constraint in constraints.items()
+            if (constraint['index'] or constraint['unique'])
+            and constraint['columns'][:len(columns)] == list(columns)
+        ]
+
+    def assertUsesIndex(self, params, model, columns):
+        plan = RecipeFilter(
+            params,
+            queryset=Recipe.objects.select_related('author'),
+            request=SimpleNamespace(user=self.user)
+        ).qs[:settings.REST_FRAMEWORK['PAGE_SIZE']].explain()
+        indexes = self.get_index_names(model, columns)
+        self.assertTrue(
+            any(index in plan for index in indexes),
+            f'{model._meta.db_table} ({", ".join(columns)}):\n{plan}'
+        )
+
+    def test_feed(self):
+        self.assertUsesIndex({}, Recipe, ('pub_date', 'id'))
+
+    def test_author(self):
+        self.assertUsesIndex(
+            {'author': self.user.pk}, Recipe, ('author_id', 'pub_date')
+        )
+
+    def test_tags(self):
+        self.assertUsesIndex(
+            {'tags': [self.tag.slug]}, Recipe.tags.through, ('tag_id',)
+        )
+
+    def test_is_favorited(self):
+        self.assertUsesIndex(
+            {'is_favorited': True}, Favorite, ('user_id',)
+        )
+
+    def test_is_in_shopping_cart(self):
+        self.assertUsesIndex(
+            {'is_in_shopping_cart': True}, Basket, ('user_id',)
+        )
@@ -0,0 +1,48 @@
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from api.cache import RESPONSE_VERSION_KEY, get_version
+from recipes.models import Favorite, Recipe
+from users.models import User
+
+RECIPES_VERSION_KEY = RESPONSE_VERSION_KEY.format(resource='recipes')
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(prefix='foodgram-test-cache-'),
+    },
+})
+class UpdatePopularityTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='reader', email='reader@example.com', password='pass'
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.user, name='Рецепт', text='Текст', cooking_time=10,
+            image='recipes/images/test.png'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def update(self):
+        version = get_version(RECIPES_VERSION_KEY)
+        call_command('update_popularity', once=True, stdout=StringIO())
+        return get_version(RECIPES_VERSION_KEY) != version
+
+    def test_recipe_responses_invalidated_when_updated(self):
+        Favorite.objects.create(user=self.user, recipes=self.recipe)
+        self.assertTrue(self.update())
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.popularity, 1)
+
+    def test_nothing_updated_keeps_responses(self):
+        self.assertFalse(self.update())
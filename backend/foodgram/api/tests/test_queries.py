@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
+from users.models import Follow, User
+
+
+class RecipeQueryCountTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='reader', email='reader@example.com', password='pass'
+        )
+        authors = [
+            User.objects.create_user(
+                username=f'author{index}',
+                email=f'author{index}@example.com',
+                password='pass'
+            )
+            for index in range(3)
+        ]
+        Follow.objects.create(user=cls.user, author=authors[0])
+        tags = [
+            Tag.objects.create(
+                name=f'Тег {index}', color=f'#00000{index}',
+                slug=f'tag{index}'
+            )
+            for index in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {index}', measurement_unit='г'
+            )
+            for index in range(5)
+        ]
+        cls.recipes = []
+        for index in range(8):
+            recipe = Recipe.objects.create(
+                author=authors[index % len(authors)],
+                name=f'Рецепт {index}',
+                text='Текст',
+                cooking_time=10,
+                image='recipes/images/test.png'
+            )
+            recipe.tags.set(tags[:index % len(tags) + 1])
+            IngredientInRecipe.objects.bulk_create(
+                IngredientInRecipe(
+                    recipe=recipe, ingredient=ingredient, amount=10
+                )
+                for ingredient in ingredients[:index % len(ingredients) + 1]
+            )
+            cls.recipes.append(recipe)
+        cls.recipes[0].favorite_list.create(user=cls.user)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_list_queries_do_not_depend_on_page_size(self):
+        expected = self.count_queries('/api/recipes/?limit=2')
+        cache.clear()
+        with self.assertNumQueries(expected):
+            response = self.client.get('/api/recipes/?limit=6')
+        self.assertEqual(len(response.data['results']), 6)
+
+    def test_retrieve_queries_do_not_depend_on_recipe_size(self):
+        expected = self.count_queries(
+            f'/api/recipes/{self.recipes[0].pk}/'
+        )
+        cache.clear()
+        with self.assertNumQueries(expected):
+            self.client.get(f'/api/recipes/{self.recipes[-1].pk}/')
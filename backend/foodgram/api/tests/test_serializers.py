@@ -0,0 +1,34 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from api.serializers import is_same_file
+from recipes.models import Recipe
+from users.models import User
+
+
+class IsSameFileTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        cls.recipe = Recipe.objects.create(
+            author=author, name='Рецепт', text='Текст', cooking_time=10,
+            image=SimpleUploadedFile('first.png', b'first image')
+        )
+
+    def test_same_content_under_another_name(self):
+        upload = SimpleUploadedFile('other.PNG', b'first image')
+        self.assertTrue(is_same_file(self.recipe.image, upload))
+        self.assertEqual(upload.read(), b'first image')
+
+    def test_other_content(self):
+        self.assertFalse(is_same_file(
+            self.recipe.image, SimpleUploadedFile('first.png', b'second')
+        ))
+
+    def test_other_extension(self):
+        self.assertFalse(is_same_file(
+            self.recipe.image, SimpleUploadedFile('first.jpg', b'first image')
+        ))
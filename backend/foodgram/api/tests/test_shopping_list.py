@@ -0,0 +1,44 @@
+from django.test import TestCase
+
+from recipes.models import Ingredient, ShoppingListItem
+from users.models import User
+
+
+class ShoppingListApplyTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                username=f'user{index}',
+                email=f'user{index}@example.com',
+                password='pass'
+            )
+            for index in range(2)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {index}', measurement_unit='г'
+            )
+            for index in range(3)
+        ]
+
+    def get_amounts(self, user):
+        return dict(ShoppingListItem.objects.filter(user=user).values_list(
+            'ingredient_id', 'amount'
+        ))
+
+    def test_apply_adds_updates_and_removes_items(self):
+        first, second, third = (item.pk for item in self.ingredients)
+        user_ids = [user.pk for user in self.users]
+        ShoppingListItem.objects.apply(user_ids[:1], {first: 5})
+        ShoppingListItem.objects.apply(
+            user_ids, {first: 10, second: 3, third: -4}
+        )
+        self.assertEqual(self.get_amounts(self.users[0]),
+                         {first: 15, second: 3})
+        self.assertEqual(self.get_amounts(self.users[1]),
+                         {first: 10, second: 3})
+        ShoppingListItem.objects.apply(user_ids, {first: -10, second: -3})
+        self.assertEqual(self.get_amounts(self.users[0]), {first: 5})
+        self.assertEqual(self.get_amounts(self.users[1]), {})
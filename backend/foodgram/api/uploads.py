@@ -0,0 +1,90 @@
+import uuid
+
+import filetype
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from drf_extra_fields.fields import Base64ImageField
+from rest_framework.serializers import ValidationError
+
+TOO_LARGE_MESSAGE = 'Файл больше {max_size} байт.'
+INVALID_TYPE_MESSAGE = 'Загрузите картинку в формате {types}.'
+EMPTY_MESSAGE = 'Файл не передан.'
+
+
+class ImageStreamWriter:
+    header_size = 262
+
+    def __init__(self, max_size, content_type=None):
+        self.max_size = max_size
+        self.size = 0
+        self.header = b''
+        self.extension = None
+        self.file = TemporaryUploadedFile(
+            'upload', content_type, None, None
+        )
+
+    def check_type(self):
+        extension = filetype.guess_extension(self.header)
+        if extension not in Base64ImageField.ALLOWED_TYPES:
+            raise ValidationError(INVALID_TYPE_MESSAGE.format(
+                types=', '.join(Base64ImageField.ALLOWED_TYPES)
+            ))
+        self.extension = 'jpg' if extension == 'jpeg' else extension
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            self.file.close()
+            raise ValidationError(
+                TOO_LARGE_MESSAGE.format(max_size=self.max_size)
+            )
+        if self.extension is None:
+            self.header += chunk[:self.header_size - len(self.header)]
+            if len(self.header) >= self.header_size:
+                self.check_type()
+        self.file.write(chunk)
+
+    def finish(self):
+        if not self.size:
+            self.file.close()
+            raise ValidationError(EMPTY_MESSAGE)
+        if self.extension is None:
+            self.check_type()
+        self.file.seek(0)
+        self.file.size = self.size
+        self.file.name = f'{uuid.uuid4()}.{self.extension}'
+        return self.file
+
+
+class ImageUploadHandler(FileUploadHandler):
+
+    def __init__(self, request, max_size):
+        super().__init__(request)
+        self.max_size = max_size
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        if content_length > self.max_size:
+            raise ValidationError(
+                TOO_LARGE_MESSAGE.format(max_size=self.max_size)
+            )
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.writer = ImageStreamWriter(self.max_size, self.content_type)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.writer.write(raw_data)
+
+    def file_complete(self, file_size):
+        return self.writer.finish()
+
+
+def read_image_stream(stream, content_type, max_size,
+                      chunk_size=FileUploadHandler.chunk_size):
+    if stream is None:
+        raise ValidationError(EMPTY_MESSAGE)
+    writer = ImageStreamWriter(max_size, content_type)
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        writer.write(chunk)
+    return writer.finish()
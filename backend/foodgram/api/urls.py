@@ -6,6 +6,7 @@ from api.views import (
     IngredientViewSet,
     CustomUserViewSet,
     RecipeViewSet,
+    TokenCacheStatsView,
 )
 
 app_name = 'api'
@@ -18,5 +19,6 @@ router.register(r'users', CustomUserViewSet, basename='users')
 urlpatterns = [
     path('', include(router.urls)),
     path('', include('djoser.urls')),
+    path('auth/token/stats/', TokenCacheStatsView.as_view()),
     re_path(r'^auth/', include('djoser.urls.authtoken')),
 ]
@@ -1,13 +1,17 @@
+from django.conf import settings
 from rest_framework.viewsets import ModelViewSet
 from django.shortcuts import get_object_or_404
-from django.db.models import Sum
+from django.db.models import OuterRef, Prefetch, Subquery
 from rest_framework import status
 from rest_framework.response import Response
-from django.http.response import HttpResponse
+from django.http.response import StreamingHttpResponse
 from djoser.views import UserViewSet
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.filters import SearchFilter
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 
 from api.serializers import (
@@ -18,24 +22,40 @@ from api.serializers import (
     CreatRecipeSerializer,
     CustomUserSerializer,
     ReadBasketSerializer,
-    ReadFavoriteSerializer
+    ReadFavoriteSerializer,
+    get_recipes_limit
 )
 from recipes.models import (
     Recipe,
     Tag,
     Ingredient,
-    IngredientInRecipe,
     Favorite,
-    Basket
+    Basket,
+    ImageUpload
 )
+from recipes.search import ingredient_index
 from users.models import User, Follow
-from api.paginator import Pagntr
+from api.paginator import CachedCountPagntr, Pagntr
+from api.authentication import token_cache
+from api.bulk import get_ids, link_many, unlink_many
+from api.cache import ResponseCacheMixin
 from api.mixins import CustomMixin
 from api.permissions import (
     IsAdminOrReadOnlyPermission,
     IsAuthorOrReadOnlyPermission
 )
-from api.filters import IngredientFilter, RecipeFilter
+from api.filters import IngredientFilter, RecipeFilter, get_recipe_ordering
+from api.uploads import (
+    TOO_LARGE_MESSAGE,
+    ImageUploadHandler,
+    read_image_stream
+)
+from api.renderers import (
+    CSVShoppingListRenderer,
+    PDFShoppingListRenderer,
+    ShoppingListNegotiation,
+    TextShoppingListRenderer
+)
 
 
 class CustomUserViewSet(UserViewSet):
@@ -43,6 +63,7 @@ class CustomUserViewSet(UserViewSet):
     serializer_class = CustomUserSerializer
     permission_classes = (IsAuthenticated,)
     pagination_class = Pagntr
+    cursor_ordering = ('-id',)
     lookup_field = 'id'
 
     @action(detail=True, methods=('POST', 'DELETE'))
@@ -69,12 +90,42 @@ class CustomUserViewSet(UserViewSet):
         subscribe.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=('POST', 'DELETE'), url_path='subscribe')
+    def subscribe_many(self, request):
+        ids = get_ids(request)
+        if request.method == 'POST':
+            results = link_many(
+                request.user, Follow, 'author', User.objects.all(), ids,
+                forbidden=(request.user.id,)
+            )
+        else:
+            results = unlink_many(request.user, Follow, 'author', ids)
+        return Response({'results': results})
+
+    @staticmethod
+    def _subscriptions_queryset(request):
+        recipes = Recipe.objects.prefetch_related('tags', 'renditions')
+        recipes_limit = get_recipes_limit(request)
+        if recipes_limit is not None:
+            recipes = recipes.filter(pk__in=Subquery(
+                Recipe.objects.filter(
+                    author=OuterRef('author')
+                ).values('pk')[:recipes_limit]
+            ))
+        return Follow.objects.filter(
+            user=request.user
+        ).select_related('author__stats').prefetch_related(
+            Prefetch(
+                'author__recipes',
+                queryset=recipes,
+                to_attr='limited_recipes'
+            )
+        ).order_by('-id')
+
     @action(detail=False, methods=('GET',))
     def subscriptions(self, request):
         result = self.paginate_queryset(
-            Follow.objects.filter(
-                user=request.user
-            )
+            self._subscriptions_queryset(request)
         )
         serializer = FollowSerializer(
             result, many=True, context={'request': request}
@@ -87,6 +138,7 @@ class TagViewSet(CustomMixin):
     queryset = Tag.objects.all()
     permission_classes = (IsAdminOrReadOnlyPermission,)
     pagination_class = None
+    cache_resources = ('tags',)
 
 
 class IngredientViewSet(CustomMixin):
@@ -96,14 +148,30 @@ class IngredientViewSet(CustomMixin):
     filter_backends = (DjangoFilterBackend, SearchFilter)
     filterset_class = IngredientFilter
     pagination_class = None
+    cache_resources = ('ingredients',)
+
+    def get_list_response(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name or not settings.INGREDIENT_INDEX_ENABLED:
+            return super().get_list_response(request, *args, **kwargs)
+        return Response(ingredient_index.search(name))
 
 
-class RecipeViewSet(ModelViewSet):
+class RecipeViewSet(ResponseCacheMixin, ModelViewSet):
     queryset = Recipe.objects.all()
     permission_classes = [IsAuthorOrReadOnlyPermission, ]
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
-    pagination_class = Pagntr
+    pagination_class = CachedCountPagntr
+    cache_resources = ('recipes',)
+    cache_anonymous_only = True
+
+    @property
+    def cursor_ordering(self):
+        return get_recipe_ordering(self.request.query_params.get('ordering'))
+
+    def get_queryset(self):
+        return self.queryset.select_related('author')
 
     def get_serializer_class(self):
         if self.request.method in ('POST', 'PUT', 'PATCH', 'DELETE'):
@@ -127,6 +195,48 @@ class RecipeViewSet(ModelViewSet):
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def _bulk_links(self, request, model):
+        ids = get_ids(request)
+        if request.method == 'POST':
+            results = link_many(
+                request.user, model, 'recipes', Recipe.objects.all(), ids
+            )
+        else:
+            results = unlink_many(request.user, model, 'recipes', ids)
+        return Response({'results': results})
+
+    @action(
+        detail=False,
+        methods=('POST',),
+        permission_classes=(IsAuthenticated,),
+        parser_classes=(MultiPartParser,)
+    )
+    def upload_image(self, request):
+        max_size = settings.IMAGE_UPLOAD_MAX_SIZE
+        if request.content_type.startswith('multipart/form-data'):
+            request._request.upload_handlers = [
+                ImageUploadHandler(request._request, max_size)
+            ]
+            image = request.FILES.get('image')
+            if image is None:
+                raise ValidationError({'image': 'Обязательное поле.'})
+        else:
+            if int(request.META.get('CONTENT_LENGTH') or 0) > max_size:
+                raise ValidationError(
+                    TOO_LARGE_MESSAGE.format(max_size=max_size)
+                )
+            image = read_image_stream(
+                request.stream, request.content_type, max_size
+            )
+        try:
+            upload = ImageUpload.objects.create(user=request.user, file=image)
+        finally:
+            image.close()
+        return Response(
+            {'token': upload.token, 'size': image.size},
+            status=status.HTTP_201_CREATED
+        )
+
     @action(detail=True, methods=('POST',))
     def favorite(self, request, pk):
         return self._common_post(request, pk, ReadFavoriteSerializer)
@@ -141,6 +251,15 @@ class RecipeViewSet(ModelViewSet):
         fav_list.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(
+        detail=False,
+        methods=('POST', 'DELETE'),
+        url_path='favorite',
+        permission_classes=(IsAuthenticated,)
+    )
+    def favorite_many(self, request):
+        return self._bulk_links(request, Favorite)
+
     @action(detail=True, methods=('POST',))
     def shopping_cart(self, request, pk):
         return self._common_post(request, pk, ReadBasketSerializer)
@@ -155,21 +274,42 @@ class RecipeViewSet(ModelViewSet):
         bas_list.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    @action(detail=False, methods=('GET',))
+    @action(
+        detail=False,
+        methods=('POST', 'DELETE'),
+        url_path='shopping_cart',
+        permission_classes=(IsAuthenticated,)
+    )
+    def shopping_cart_many(self, request):
+        return self._bulk_links(request, Basket)
+
+    @action(
+        detail=False,
+        methods=('GET',),
+        permission_classes=(IsAuthenticated,),
+        content_negotiation_class=ShoppingListNegotiation,
+        renderer_classes=(
+            TextShoppingListRenderer,
+            CSVShoppingListRenderer,
+            PDFShoppingListRenderer,
+        )
+    )
     def download_shopping_cart(self, request):
-        text = 'Список покупок:'
         user = request.user
-        filename = f'{user.username}_shopping_list.txt'
-        ingredients = IngredientInRecipe.objects.filter(
-            recipe__basket_list__user=user
-        ).values(
-            'ingredient__name', 'ingredient__measurement_unit',
-        ).annotate(amount=Sum('amount'))
-        text += '\n'.join([f'{i.get("ingredient__name")}: {i.get("amount")} '
-                           f'{i.get("ingredient__measurement_unit")}'
-                           for i in ingredients])
-        response = HttpResponse(
-            text, content_type='text/plain'
+        renderer = request.accepted_renderer
+        filename = f'{user.username}_shopping_list.{renderer.format}'
+        ingredients = user.shopping_list.filter(amount__gt=0).values_list(
+            'ingredient__name', 'ingredient__measurement_unit', 'amount'
+        ).order_by('ingredient__name').iterator()
+        response = StreamingHttpResponse(
+            renderer.stream(ingredients), content_type=renderer.media_type
         )
         response['Content-Disposition'] = f'attachment; filename={filename}'
         return response
+
+
+class TokenCacheStatsView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(token_cache.stats())
@@ -0,0 +1,7 @@
+from django.urls import include, path
+
+from foodgram.urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/', include('api.async_urls')),
+] + sync_urlpatterns
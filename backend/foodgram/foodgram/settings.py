@@ -5,7 +5,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 config = AutoConfig(search_path=BASE_DIR)
 SECRET_KEY = config('SECRET_KEY', default='123', cast=str)
 DEBUG = config('DEBUG', default=False, cast=bool)
-ALLOWED_HOSTS = config('ALLOWED_HOSTS', default=['*'], cast=Csv())
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='*', cast=Csv())
 
 
 INSTALLED_APPS = [
@@ -15,6 +15,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'django_filters',
@@ -34,7 +35,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'foodgram.urls'
+ROOT_URLCONF = config('ROOT_URLCONF', default='foodgram.urls')
 
 TEMPLATES = [
     {
@@ -99,11 +100,60 @@ STATIC_ROOT = BASE_DIR / 'static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache',
+            cast=str
+        ),
+        'LOCATION': config('CACHE_LOCATION', default='foodgram', cast=str),
+    }
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MAX_LENGTH = 200
+MAX_AMOUNT = 32767
 SHOW_RECIPE_TEXT = 15
 COLOR_MAX_LENGTH = 7
+PDF_FONT_NAME = 'DejaVuSans'
+PDF_FONT_PATH = config(
+    'PDF_FONT_PATH',
+    default='/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    cast=str
+)
+INGREDIENT_INDEX_ENABLED = config(
+    'INGREDIENT_INDEX_ENABLED', default=True, cast=bool
+)
+INGREDIENT_INDEX_TTL = 300
+INGREDIENT_SEARCH_LIMIT = 50
+COUNT_CACHE_TIMEOUT = 60
+COUNT_ESTIMATE_MIN = 100000
+RESPONSE_CACHE_TIMEOUT = 300
+RECIPE_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+RENDITION_NAME_MAX_LENGTH = 16
+RECIPE_IMAGE_RENDITIONS = {
+    'thumbnail': 160,
+    'card': 480,
+    'detail': 1024,
+}
+RECIPE_IMAGE_FORMATS = ('webp', 'jpeg')
+RECIPE_IMAGE_QUALITY = 80
+IMAGE_WORKER_BATCH_SIZE = 10
+IMAGE_WORKER_SLEEP = 2
+IMAGE_WORKER_TIMEOUT = 300
+IMAGE_UPLOAD_MAX_SIZE = 15 * 1024 * 1024
+IMAGE_UPLOAD_TTL = 24 * 60 * 60
+MEDIA_GC_GRACE = 60 * 60
+IMPORT_BATCH_SIZE = 1000
+BULK_MAX_IDS = 100
+POPULARITY_WINDOW_DAYS = 7
+POPULARITY_UPDATE_INTERVAL = 10 * 60
+TOKEN_CACHE_ALIAS = config('TOKEN_CACHE_ALIAS', default='', cast=str)
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_TTL = 60
+ASYNC_READ_WORKERS = config('ASYNC_READ_WORKERS', default=16, cast=int)
 
 DJOSER = {
     'LOGIN_FIELD': 'email',
@@ -125,7 +175,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'api.paginator.Pagntr',
     'PAGE_SIZE': 6,
@@ -0,0 +1,14 @@
+import tempfile
+
+from foodgram.settings import *  # noqa: F401,F403
+from foodgram.settings import config
+
+if not config('DB_ENGINE', default='', cast=str):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
+    }
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='foodgram-test-media-')
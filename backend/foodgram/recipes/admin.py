@@ -6,7 +6,8 @@ from recipes.models import (
     IngredientInRecipe,
     Recipe,
     Basket,
-    Favorite
+    Favorite,
+    ShoppingListItem
 )
 
 
@@ -30,16 +31,19 @@ class RecipeInIngredientAdmin(admin.TabularInline):
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('name', 'author', 'favorite_calc')
+    list_display = ('name', 'author', 'favorites_count', 'baskets_count')
     list_filter = ('name', 'author__username', 'tags__name')
+    list_select_related = ('author',)
     search_fields = ('name', 'author__username', 'tags__name')
-    readonly_fields = ('favorite_calc',)
+    readonly_fields = ('favorites_count', 'baskets_count')
     inlines = (RecipeInIngredientAdmin,)
 
-    def favorite_calc(self, obj):
-        return obj.favorite_list.count()
-
-    favorite_calc.short_description = 'Добавлено в избранное'
+    def save_related(self, request, form, formsets, change):
+        old_amounts = form.instance.ingredient_amounts() if change else {}
+        super().save_related(request, form, formsets, change)
+        ShoppingListItem.objects.apply_recipe_change(
+            form.instance, old_amounts
+        )
 
 
 @admin.register(Favorite)
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class RecipesConfig(AppConfig):
     name = 'recipes'
     verbose_name = 'Рецепты'
+
+    def ready(self):
+        import recipes.signals  # noqa: F401
+        from recipes.indexes import create_search_indexes
+
+        post_migrate.connect(create_search_indexes, sender=self)
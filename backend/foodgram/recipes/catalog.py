@@ -0,0 +1,404 @@
+import csv
+import io
+import json
+from collections import Counter
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from recipes.models import (
+    Basket,
+    Favorite,
+    Ingredient,
+    IngredientInRecipe,
+    Recipe,
+    RecipeImageTask,
+    ShoppingListItem,
+    Tag
+)
+from users.models import Follow, User, UserStats
+
+USER_FIELDS = (
+    'username', 'email', 'first_name', 'last_name', 'password',
+    'is_active', 'is_staff', 'is_superuser'
+)
+RECIPE_FIELDS = (
+    'author_id', 'name', 'text', 'cooking_time', 'image', 'pub_date',
+    'favorites_count', 'baskets_count', 'popularity'
+)
+
+
+def merge_related(recipes, related, name):
+    groups = groupby(related, key=itemgetter(0))
+    current = next(groups, None)
+    for recipe in recipes:
+        while current is not None and current[0] < recipe['id']:
+            current = next(groups, None)
+        recipe[name] = []
+        if current is not None and current[0] == recipe['id']:
+            recipe[name] = [list(row[1:]) for row in current[1]]
+            current = next(groups, None)
+        yield recipe
+
+
+def iter_catalog(chunk_size):
+    for user in User.objects.order_by('id').values(*USER_FIELDS).iterator(
+        chunk_size
+    ):
+        yield 'user', user
+    for tag in Tag.objects.order_by('id').values('name', 'color', 'slug'):
+        yield 'tag', tag
+    for ingredient in Ingredient.objects.order_by('id').values(
+        'name', 'measurement_unit'
+    ).iterator(chunk_size):
+        yield 'ingredient', ingredient
+    recipes = Recipe.objects.order_by('id').values(
+        'id', 'author__username', 'name', 'text', 'cooking_time', 'image',
+        'pub_date'
+    ).iterator(chunk_size)
+    recipes = merge_related(
+        recipes,
+        Recipe.tags.through.objects.order_by('recipe_id').values_list(
+            'recipe_id', 'tag__slug'
+        ).iterator(chunk_size),
+        'tags'
+    )
+    recipes = merge_related(
+        recipes,
+        IngredientInRecipe.objects.order_by('recipe_id').values_list(
+            'recipe_id', 'ingredient__name', 'ingredient__measurement_unit',
+            'amount'
+        ).iterator(chunk_size),
+        'ingredients'
+    )
+    for recipe in recipes:
+        recipe['author'] = recipe.pop('author__username')
+        recipe['pub_date'] = recipe['pub_date'].isoformat()
+        recipe['tags'] = [slug for slug, in recipe['tags']]
+        yield 'recipe', recipe
+    for username, recipe_id, created in Favorite.objects.order_by(
+        'id'
+    ).values_list('user__username', 'recipes_id', 'created').iterator(
+        chunk_size
+    ):
+        yield 'favorite', {
+            'user': username, 'recipe': recipe_id,
+            'created': created.isoformat()
+        }
+    for username, recipe_id in Basket.objects.order_by('id').values_list(
+        'user__username', 'recipes_id'
+    ).iterator(chunk_size):
+        yield 'basket', {'user': username, 'recipe': recipe_id}
+    for username, author in Follow.objects.order_by('id').values_list(
+        'user__username', 'author__username'
+    ).iterator(chunk_size):
+        yield 'follow', {'user': username, 'author': author}
+
+
+def export_catalog(stream, chunk_size):
+    counts = Counter()
+    for kind, item in iter_catalog(chunk_size):
+        stream.write(json.dumps(
+            {'type': kind, **item}, ensure_ascii=False
+        ) + '\n')
+        counts[kind] += 1
+    return counts
+
+
+class BulkWriter:
+    raw = False
+
+    def __init__(self, model, fields, batch_size):
+        self.model = model
+        self.fields = fields
+        self.batch_size = batch_size
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        self.model.objects.bulk_create(
+            [self.model(**dict(zip(self.fields, row))) for row in self.rows],
+            ignore_conflicts=True
+        )
+        self.rows = []
+
+
+class SQLiteWriter(BulkWriter):
+    raw = True
+
+    def get_names(self):
+        quote = connection.ops.quote_name
+        return quote(self.model._meta.db_table), ', '.join(
+            quote(self.model._meta.get_field(field).column)
+            for field in self.fields
+        )
+
+    def flush(self):
+        if not self.rows:
+            return
+        table, columns = self.get_names()
+        placeholders = ', '.join(['%s'] * len(self.fields))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR IGNORE INTO {table} ({columns}) '
+                f'VALUES ({placeholders})',
+                self.rows
+            )
+        self.rows = []
+
+
+class CopyWriter(SQLiteWriter):
+
+    def flush(self):
+        if not self.rows:
+            return
+        table, columns = self.get_names()
+        buffer = io.StringIO()
+        # quoted '' stays an empty string, unquoted it is read as NULL
+        csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC).writerows(self.rows)
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE import_buffer AS '
+                f'SELECT {columns} FROM {table} WITH NO DATA'
+            )
+            cursor.copy_expert(
+                f'COPY import_buffer ({columns}) FROM STDIN '
+                f'WITH (FORMAT csv)',
+                buffer
+            )
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) '
+                f'SELECT {columns} FROM import_buffer ON CONFLICT DO NOTHING'
+            )
+            cursor.execute('DROP TABLE import_buffer')
+        self.rows = []
+
+
+def get_writer(model, fields, batch_size):
+    if connection.vendor == 'postgresql':
+        return CopyWriter(model, fields, batch_size)
+    if connection.vendor == 'sqlite':
+        return SQLiteWriter(model, fields, batch_size)
+    return BulkWriter(model, fields, batch_size)
+
+
+LINK_TABLES = {
+    'recipe_tag': (Recipe.tags.through, ('recipe_id', 'tag_id')),
+    'recipe_ingredient': (
+        IngredientInRecipe, ('recipe_id', 'ingredient_id', 'amount')
+    ),
+    'favorite': (Favorite, ('user_id', 'recipes_id', 'created')),
+    'basket': (Basket, ('user_id', 'recipes_id')),
+    'follow': (Follow, ('user_id', 'author_id')),
+}
+
+
+class CatalogImporter:
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.users = dict(User.objects.values_list('username', 'id'))
+        self.tags = dict(Tag.objects.values_list('slug', 'id'))
+        self.ingredients = {
+            (name, measurement_unit): pk
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            )
+        }
+        self.existing_recipes = {
+            (author_id, name): pk
+            for pk, author_id, name in Recipe.objects.values_list(
+                'id', 'author_id', 'name'
+            )
+        }
+        self.recipes = {}
+        self.basket_users = set()
+        self.writers = {
+            kind: get_writer(model, fields, batch_size)
+            for kind, (model, fields) in LINK_TABLES.items()
+        }
+        self.handlers = {
+            'user': self.import_user,
+            'tag': self.import_tag,
+            'ingredient': self.import_ingredient,
+            'recipe': self.import_recipe,
+            'favorite': self.import_favorite,
+            'basket': self.import_basket,
+            'follow': self.import_follow,
+        }
+        self.pending_kind = None
+        self.pending = []
+        self.counts = Counter()
+
+    def add(self, item):
+        kind = item.get('type')
+        if kind != self.pending_kind or len(self.pending) >= self.batch_size:
+            self.flush_pending()
+            self.pending_kind = kind
+        self.pending.append(item)
+
+    def flush_pending(self):
+        if self.pending:
+            handler = self.handlers.get(self.pending_kind)
+            if handler is None:
+                self.counts['skipped'] += len(self.pending)
+            else:
+                handler(self.pending)
+                self.counts[self.pending_kind] += len(self.pending)
+        self.pending = []
+
+    def finish(self):
+        self.flush_pending()
+        for writer in self.writers.values():
+            writer.flush()
+        if self.basket_users:
+            ShoppingListItem.objects.rebuild(users=self.basket_users)
+        Recipe.objects.recount()
+        Recipe.objects.update_popularity(timezone.now() - timedelta(
+            days=settings.POPULARITY_WINDOW_DAYS
+        ))
+        UserStats.objects.recount()
+        return self.counts
+
+    def insert(self, model, objects, key_map, key_field):
+        model.objects.bulk_create(objects, ignore_conflicts=True)
+        key_map.update(model.objects.filter(**{
+            f'{key_field}__in': [getattr(obj, key_field) for obj in objects]
+        }).values_list(key_field, 'id'))
+
+    def import_user(self, items):
+        users = {}
+        for item in items:
+            if item.get('username') and item['username'] not in self.users:
+                users[item['username']] = User(**{
+                    field: item[field] for field in USER_FIELDS
+                    if field in item
+                })
+        self.insert(User, list(users.values()), self.users, 'username')
+
+    def import_tag(self, items):
+        tags = {}
+        for item in items:
+            if item.get('slug') and item['slug'] not in self.tags:
+                tags[item['slug']] = Tag(
+                    name=item['name'], color=item['color'], slug=item['slug']
+                )
+        self.insert(Tag, list(tags.values()), self.tags, 'slug')
+
+    def import_ingredient(self, items):
+        ingredients = {}
+        for item in items:
+            key = (item.get('name'), item.get('measurement_unit'))
+            if all(key) and key not in self.ingredients:
+                ingredients[key] = Ingredient(
+                    name=key[0], measurement_unit=key[1]
+                )
+        Ingredient.objects.bulk_create(
+            ingredients.values(), ignore_conflicts=True
+        )
+        self.ingredients.update(
+            ((name, measurement_unit), pk)
+            for pk, name, measurement_unit in Ingredient.objects.filter(
+                name__in={name for name, _ in ingredients}
+            ).values_list('id', 'name', 'measurement_unit')
+        )
+
+    def import_recipe(self, items):
+        new = {}
+        for item in items:
+            author_id = self.users.get(item.get('author'))
+            if author_id is None or not item.get('cooking_time'):
+                continue
+            key = (author_id, item.get('name'))
+            if key in self.existing_recipes:
+                self.recipes[item.get('id')] = self.existing_recipes[key]
+            elif key not in new:
+                new[key] = item
+        writer = get_writer(Recipe, RECIPE_FIELDS, len(new) + 1)
+        pub_date = Recipe._meta.get_field('pub_date')
+        now = timezone.now()
+        for (author_id, name), item in new.items():
+            item['pub_date'] = (
+                parse_datetime(item.get('pub_date') or '') or now
+            )
+            writer.write((
+                author_id, name, item.get('text', ''), item['cooking_time'],
+                item.get('image', ''),
+                pub_date.get_db_prep_save(item['pub_date'], connection),
+                0, 0, 0
+            ))
+        writer.flush()
+        created = Recipe.objects.filter(
+            author_id__in={author_id for author_id, _ in new},
+            name__in={name for _, name in new}
+        ).only('id', 'author_id', 'name', 'pub_date')
+        recipes = []
+        for recipe in created:
+            key = (recipe.author_id, recipe.name)
+            if key not in new or key in self.existing_recipes:
+                continue
+            item = new[key]
+            self.existing_recipes[key] = recipe.id
+            self.recipes[item.get('id')] = recipe.id
+            recipe.pub_date = item['pub_date']
+            recipes.append(recipe)
+            self.write_recipe_links(recipe.id, item)
+        if not writer.raw:
+            Recipe.objects.bulk_update(recipes, ('pub_date',))
+        RecipeImageTask.objects.bulk_create(
+            [RecipeImageTask(recipe=recipe) for recipe in recipes],
+            ignore_conflicts=True
+        )
+
+    def write_recipe_links(self, recipe_id, item):
+        for slug in set(item.get('tags') or ()):
+            if slug in self.tags:
+                self.writers['recipe_tag'].write((recipe_id, self.tags[slug]))
+        amounts = Counter()
+        for name, measurement_unit, amount in item.get('ingredients') or ():
+            ingredient_id = self.ingredients.get((name, measurement_unit))
+            if ingredient_id is not None:
+                amounts[ingredient_id] += amount
+        for ingredient_id, amount in amounts.items():
+            self.writers['recipe_ingredient'].write(
+                (recipe_id, ingredient_id, amount)
+            )
+
+    def import_links(self, kind, items, target_map, target_field,
+                     extra=lambda item: ()):
+        for item in items:
+            user_id = self.users.get(item.get('user'))
+            target_id = target_map.get(item.get(target_field))
+            if user_id is None or target_id is None:
+                continue
+            if kind == 'basket':
+                self.basket_users.add(user_id)
+            self.writers[kind].write((user_id, target_id, *extra(item)))
+
+    def import_favorite(self, items):
+        created = Favorite._meta.get_field('created')
+        now = timezone.now()
+        self.import_links(
+            'favorite', items, self.recipes, 'recipe',
+            lambda item: (created.get_db_prep_save(
+                parse_datetime(item.get('created') or '') or now, connection
+            ),)
+        )
+
+    def import_basket(self, items):
+        self.import_links('basket', items, self.recipes, 'recipe')
+
+    def import_follow(self, items):
+        self.import_links('follow', items, self.users, 'author')
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from recipes.models import RecipeImageRendition, RecipeImageTask
+
+FORMAT_EXTENSIONS = {'jpeg': 'jpg', 'webp': 'webp'}
+
+
+def enqueue_renditions(recipe):
+    RecipeImageTask.objects.update_or_create(
+        recipe=recipe,
+        defaults={'status': RecipeImageTask.PENDING, 'error': ''}
+    )
+
+
+def open_image(field_file):
+    with field_file.open('rb') as source:
+        Image.open(source).verify()
+    with field_file.open('rb') as source:
+        image = Image.open(source)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    return image
+
+
+def encode(image, image_format):
+    if image_format == 'jpeg' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    buffer = BytesIO()
+    image.save(
+        buffer, image_format, quality=settings.RECIPE_IMAGE_QUALITY,
+        optimize=True
+    )
+    return buffer.getvalue()
+
+
+def build_renditions(recipe):
+    image = open_image(recipe.image)
+    existing = {
+        (rendition.name, rendition.format): rendition
+        for rendition in recipe.renditions.all()
+    }
+    sizes = set()
+    for name, width in sorted(
+        settings.RECIPE_IMAGE_RENDITIONS.items(), key=lambda item: item[1]
+    ):
+        resized = image.copy()
+        resized.thumbnail((width, image.height))
+        if resized.size in sizes:
+            continue
+        sizes.add(resized.size)
+        for image_format in settings.RECIPE_IMAGE_FORMATS:
+            rendition = existing.pop((name, image_format), None)
+            if rendition is None:
+                rendition = RecipeImageRendition(
+                    recipe=recipe, name=name, format=image_format
+                )
+            rendition.width, rendition.height = resized.size
+            rendition.file.save(
+                f'{recipe.pk}_{name}.{FORMAT_EXTENSIONS[image_format]}',
+                ContentFile(encode(resized, image_format)),
+                save=False
+            )
+            rendition.save()
+    RecipeImageRendition.objects.filter(
+        pk__in=[rendition.pk for rendition in existing.values()]
+    ).delete()
+
+
+def claim_tasks(batch_size):
+    with transaction.atomic():
+        tasks = list(
+            RecipeImageTask.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=RecipeImageTask.PENDING)
+                | Q(status=RecipeImageTask.PROCESSING,
+                    updated__lt=timezone.now() - timedelta(
+                        seconds=settings.IMAGE_WORKER_TIMEOUT
+                    ))
+            )
+            .select_related('recipe')
+            .order_by('updated')[:batch_size]
+        )
+        claimed = timezone.now()
+        RecipeImageTask.objects.filter(
+            pk__in=[task.pk for task in tasks]
+        ).update(status=RecipeImageTask.PROCESSING, updated=claimed)
+    for task in tasks:
+        task.status, task.updated = RecipeImageTask.PROCESSING, claimed
+    return tasks
+
+
+def process_task(task):
+    try:
+        build_renditions(task.recipe)
+    except Exception as error:
+        status, message = RecipeImageTask.FAILED, str(error)
+    else:
+        status, message = RecipeImageTask.DONE, ''
+    with transaction.atomic():
+        current = RecipeImageTask.objects.select_for_update().filter(
+            pk=task.pk, status=RecipeImageTask.PROCESSING,
+            updated=task.updated
+        ).first()
+        if current is None:
+            task.status = RecipeImageTask.PENDING
+            return task
+        current.status, current.error = status, message
+        current.save(update_fields=('status', 'error', 'updated'))
+    return current
@@ -0,0 +1,241 @@
+import csv
+import json
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+
+from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
+from users.models import User
+
+WHITESPACE = re.compile(r'[\s,\[]*')
+
+
+class ImportDataError(ValueError):
+    pass
+
+
+def iter_csv(file, fields):
+    for row in csv.reader(file):
+        if not row or [value.strip() for value in row] == list(fields):
+            continue
+        yield dict(zip(fields, row))
+
+
+def iter_json(file, chunk_size=64 * 1024):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    for chunk in iter(lambda: file.read(chunk_size), ''):
+        buffer += chunk
+        position = 0
+        while True:
+            position = WHITESPACE.match(buffer, position).end()
+            if position == len(buffer) or buffer[position] == ']':
+                break
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                break
+            yield item
+        buffer = buffer[position:]
+    if buffer.strip(' \t\r\n,]'):
+        raise ImportDataError(f'Не удалось разобрать JSON: {buffer[:50]!r}')
+
+
+def clean(value):
+    return str(value or '').strip()
+
+
+def fits(*values):
+    return all(0 < len(value) <= settings.MAX_LENGTH for value in values)
+
+
+class IngredientImporter:
+    model = Ingredient
+    fields = ('name', 'measurement_unit')
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def import_batch(self, rows):
+        keys = {}
+        skipped = 0
+        for row in rows:
+            key = (clean(row.get('name')), clean(row.get('measurement_unit')))
+            if not fits(*key) or key in keys:
+                skipped += 1
+                continue
+            keys[key] = None
+        existing = set(Ingredient.objects.filter(
+            name__in={name for name, _ in keys}
+        ).values_list('name', 'measurement_unit'))
+        new = [key for key in keys if key not in existing]
+        Ingredient.objects.bulk_create(
+            [
+                Ingredient(name=name, measurement_unit=measurement_unit)
+                for name, measurement_unit in new
+            ],
+            ignore_conflicts=True
+        )
+        return len(new), 0, skipped + len(keys) - len(new)
+
+
+class TagImporter(IngredientImporter):
+    model = Tag
+    fields = ('name', 'color', 'slug')
+
+    def import_batch(self, rows):
+        tags = {}
+        skipped = 0
+        for row in rows:
+            tag = Tag(**{
+                field: clean(row.get(field)) for field in self.fields
+            })
+            try:
+                tag.clean_fields()
+            except ValidationError:
+                skipped += 1
+                continue
+            if tag.slug in tags:
+                skipped += 1
+                continue
+            tags[tag.slug] = tag
+        existing = Tag.objects.in_bulk(tags, field_name='slug')
+        changed = []
+        for slug, tag in existing.items():
+            new = tags.pop(slug)
+            if (tag.name, tag.color) == (new.name, new.color):
+                skipped += 1
+                continue
+            tag.name, tag.color = new.name, new.color
+            changed.append(tag)
+        Tag.objects.bulk_update(changed, ('name', 'color'))
+        Tag.objects.bulk_create(tags.values(), ignore_conflicts=True)
+        return len(tags), len(changed), skipped
+
+
+class RecipeImporter(IngredientImporter):
+    model = Recipe
+    fields = None
+
+    def get_ingredients(self, rows):
+        names = {
+            clean(item.get('name'))
+            for row in rows for item in row.get('ingredients') or ()
+            if isinstance(item, dict)
+        }
+        return {
+            (ingredient.name, ingredient.measurement_unit): ingredient
+            for ingredient in Ingredient.objects.filter(name__in=names)
+        }
+
+    def build(self, row, authors, tags, ingredients):
+        author = authors.get(clean(row.get('author')))
+        name = clean(row.get('name'))
+        image = clean(row.get('image'))
+        if author is None or not fits(name) or not image:
+            return None
+        try:
+            items = {}
+            for item in row['ingredients']:
+                ingredient = ingredients[(
+                    clean(item.get('name')),
+                    clean(item.get('measurement_unit'))
+                )]
+                items[ingredient] = (
+                    items.get(ingredient, 0) + int(item['amount'])
+                )
+            recipe_tags = [tags[clean(slug)] for slug in row['tags']]
+            recipe = Recipe(
+                author=author,
+                name=name,
+                text=clean(row.get('text')),
+                cooking_time=int(row['cooking_time'])
+            )
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+        if not items or not recipe_tags:
+            return None
+        return recipe, recipe_tags, items, os.path.join(self.directory, image)
+
+    def import_batch(self, rows):
+        authors = User.objects.in_bulk(
+            {clean(row.get('author')) for row in rows},
+            field_name='username'
+        )
+        tags = Tag.objects.in_bulk(
+            {clean(slug) for row in rows for slug in row.get('tags') or ()},
+            field_name='slug'
+        )
+        ingredients = self.get_ingredients(rows)
+        existing = set(Recipe.objects.filter(
+            name__in={clean(row.get('name')) for row in rows}
+        ).values_list('author__username', 'name'))
+        inserted = 0
+        recipe_ingredients = []
+        for row in rows:
+            key = (clean(row.get('author')), clean(row.get('name')))
+            built = None
+            if key not in existing:
+                built = self.build(row, authors, tags, ingredients)
+            if built is None or not os.path.isfile(built[3]):
+                continue
+            recipe, recipe_tags, items, image = built
+            with open(image, 'rb') as file:
+                recipe.image.save(
+                    os.path.basename(image), File(file), save=False
+                )
+            recipe.save()
+            recipe.tags.set(recipe_tags)
+            recipe_ingredients.extend(
+                IngredientInRecipe(
+                    recipe=recipe, ingredient=ingredient, amount=amount
+                )
+                for ingredient, amount in items.items()
+            )
+            existing.add(key)
+            inserted += 1
+        IngredientInRecipe.objects.bulk_create(recipe_ingredients)
+        return inserted, 0, len(rows) - inserted
+
+
+IMPORTERS = {
+    'ingredients': IngredientImporter,
+    'tags': TagImporter,
+    'recipes': RecipeImporter,
+}
+
+
+def read_rows(path, importer, file_format=None):
+    file_format = file_format or os.path.splitext(path)[1].lstrip('.')
+    with open(path, encoding='utf-8', newline='') as file:
+        if file_format == 'json':
+            yield from iter_json(file)
+        elif file_format == 'csv' and importer.fields:
+            yield from iter_csv(file, importer.fields)
+        else:
+            raise ImportDataError(
+                f'Формат {file_format!r} не поддерживается для {path}'
+            )
+
+
+def import_file(path, kind, batch_size, file_format=None):
+    importer = IMPORTERS[kind](os.path.dirname(path))
+    batch = []
+    for row in read_rows(path, importer, file_format):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield import_batch(importer, batch)
+            batch = []
+    if batch:
+        yield import_batch(importer, batch)
+
+
+def import_batch(importer, rows):
+    objects = [row for row in rows if isinstance(row, dict)]
+    with transaction.atomic():
+        inserted, updated, skipped = importer.import_batch(objects)
+    return len(rows), inserted, updated, skipped + len(rows) - len(objects)
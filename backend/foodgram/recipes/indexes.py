@@ -0,0 +1,34 @@
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+
+from recipes.models import Ingredient, Recipe
+
+SEARCH_MODELS = (Ingredient, Recipe)
+
+
+def create_search_indexes(using=DEFAULT_DB_ALIAS, **kwargs):
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    tables = connection.introspection.table_names()
+    with connection.cursor() as cursor:
+        try:
+            with transaction.atomic(using=using):
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            trigram = True
+        except DatabaseError:
+            trigram = False
+        for model in SEARCH_MODELS:
+            table = model._meta.db_table
+            if table not in tables:
+                continue
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {table}_name_upper_pattern '
+                f'ON {connection.ops.quote_name(table)} '
+                f'(UPPER(name) text_pattern_ops)'
+            )
+            if trigram:
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_name_upper_trgm '
+                    f'ON {connection.ops.quote_name(table)} '
+                    f'USING gin (UPPER(name) gin_trgm_ops)'
+                )
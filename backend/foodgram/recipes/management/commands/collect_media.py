@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recipes.models import ImageUpload
+from recipes.storage import (
+    content_storage,
+    get_storage_fields,
+    is_referenced,
+    reference_counts
+)
+
+
+class Command(BaseCommand):
+    help = 'Удаляет картинки, на которые не ссылается ни один объект'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=settings.MEDIA_GC_GRACE,
+            help='Не трогать файлы моложе указанного числа секунд'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        uploads = ImageUpload.objects.filter(
+            created__lt=now - timedelta(seconds=settings.IMAGE_UPLOAD_TTL)
+        )
+        if not options['dry_run']:
+            uploads = uploads.delete()[0]
+        else:
+            uploads = uploads.count()
+        counts = reference_counts()
+        directories = {
+            field.upload_to.rstrip('/') for field in get_storage_fields()
+        }
+        threshold = now - timedelta(seconds=options['grace'])
+        total = removed = freed = 0
+        for directory in sorted(directories):
+            for name in content_storage.walk(directory):
+                total += 1
+                if counts[name] or (
+                    content_storage.get_modified_time(name) > threshold
+                ) or is_referenced(name):
+                    continue
+                removed += 1
+                freed += content_storage.size(name)
+                if options['dry_run']:
+                    self.stdout.write(name)
+                else:
+                    content_storage.delete(name)
+        self.stdout.write(self.style.SUCCESS(
+            f'Просроченных загрузок: {uploads}, файлов: {total}, '
+            f'используется: {len(counts)}, удалено: {removed} '
+            f'({freed} байт)'
+        ))
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.catalog import export_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, теги, ингредиенты, рецепты, избранное, '
+        'корзины и подписки в NDJSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='файл для выгрузки, «-» — стандартный вывод'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.IMPORT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            self.stdout.ending = ''
+            counts = export_catalog(self.stdout, options['chunk_size'])
+        else:
+            with open(options['path'], 'w', encoding='utf-8') as stream:
+                counts = export_catalog(stream, options['chunk_size'])
+        self.stderr.write(self.style.SUCCESS(', '.join(
+            f'{kind}: {count}' for kind, count in counts.items()
+        ) or 'Нет данных'))
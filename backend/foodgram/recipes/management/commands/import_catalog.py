@@ -0,0 +1,54 @@
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+
+from recipes.catalog import CatalogImporter
+from recipes.importers import ImportDataError, iter_json
+from recipes.models import Ingredient, Recipe, Tag
+from recipes.signals import data_imported
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает выгрузку export_catalog. Записи, которые уже есть в '
+        'базе, пропускаются; файлы картинок нужно перенести отдельно'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='файл выгрузки, «-» — стандартный ввод'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.IMPORT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            if options['path'] == '-':
+                counts = self.load(sys.stdin, options['batch_size'])
+            else:
+                with open(options['path'], encoding='utf-8') as stream:
+                    counts = self.load(stream, options['batch_size'])
+        except (OSError, DatabaseError, ImportDataError) as error:
+            raise CommandError(error)
+        for model in (Tag, Ingredient, Recipe):
+            data_imported.send(sender=model)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f'{kind}: {count}' for kind, count in counts.items())
+            + f' за {elapsed:.1f} с'
+        ))
+
+    @staticmethod
+    def load(stream, batch_size):
+        with transaction.atomic():
+            importer = CatalogImporter(batch_size)
+            for item in iter_json(stream):
+                if isinstance(item, dict):
+                    importer.add(item)
+            return importer.finish()
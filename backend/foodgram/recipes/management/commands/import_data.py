@@ -1,34 +1,61 @@
-import csv
 import os
+import time
 
-from django.core.management.base import BaseCommand
-from django.db.utils import IntegrityError
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
 
-from recipes.models import Ingredient
+from recipes.importers import IMPORTERS, ImportDataError, import_file
+from recipes.signals import data_imported
 
 
 class Command(BaseCommand):
+    help = (
+        'Загружает ингредиенты, теги или рецепты из CSV или JSON. '
+        'Повторный запуск обновляет существующие записи'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            default=[os.path.join('data', 'ingredients.csv')]
+        )
+        parser.add_argument(
+            '--kind', choices=tuple(IMPORTERS), default='ingredients'
+        )
+        parser.add_argument(
+            '--format', choices=('csv', 'json'),
+            help='по умолчанию определяется по расширению файла'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.IMPORT_BATCH_SIZE
+        )
 
     def handle(self, *args, **options):
-        if Ingredient.objects.exists():
-            self.stdout.write(self.style.WARNING('Данные загружены'))
-            return None
+        totals = [0, 0, 0, 0]
+        started = time.monotonic()
         try:
-            self.load_data(path=os.path.join('data', 'ingredients.csv'))
-        except Exception as err:
-            self.stdout.write(
-                self.style.ERROR(f'Error: {err}'))
-        else:
-            self.stdout.write(self.style.SUCCESS('Данные добавлены'))
-
-    @staticmethod
-    def load_data(path):
-        with open(path, encoding='UTF-8') as f:
-            reader = csv.reader(f)
-            next(reader)
-            try:
-                Ingredient.objects.bulk_create(
-                    [Ingredient(name=name, measurement_unit=measurement_unit)
-                     for name, measurement_unit in reader])
-            except IntegrityError:
-                pass
+            for path in options['paths']:
+                for counts in import_file(
+                    path, options['kind'], options['batch_size'],
+                    options['format']
+                ):
+                    totals = [
+                        total + count for total, count in zip(totals, counts)
+                    ]
+                self.stdout.write(f'{path}: обработано строк {totals[0]}')
+        except (OSError, DatabaseError, ImportDataError) as error:
+            raise CommandError(error)
+        finally:
+            if totals[0]:
+                data_imported.send(
+                    sender=IMPORTERS[options['kind']].model
+                )
+        elapsed = time.monotonic() - started
+        rows, inserted, updated, skipped = totals
+        self.stdout.write(self.style.SUCCESS(
+            f'Строк: {rows} за {elapsed:.1f} с '
+            f'({rows / max(elapsed, 0.001):.0f} строк/с). '
+            f'Добавлено: {inserted}, обновлено: {updated}, '
+            f'пропущено: {skipped}'
+        ))
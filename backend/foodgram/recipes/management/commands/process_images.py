@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.checks import shared_cache_check
+from recipes.images import claim_tasks, process_task
+from recipes.models import RecipeImageTask
+
+
+class Command(BaseCommand):
+    help = 'Готовит уменьшенные копии картинок рецептов из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='обработать очередь и завершиться'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.IMAGE_WORKER_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        errors = shared_cache_check(None)
+        if errors:
+            raise CommandError(errors[0].msg)
+        while True:
+            tasks = claim_tasks(options['batch_size'])
+            for task in tasks:
+                task = process_task(task)
+                if task.status == RecipeImageTask.FAILED:
+                    self.stdout.write(self.style.ERROR(
+                        f'Рецепт {task.recipe_id}: {task.error}'
+                    ))
+                elif task.status == RecipeImageTask.PENDING:
+                    self.stdout.write(
+                        f'Рецепт {task.recipe_id}: картинка изменилась, '
+                        'задача снова в очереди'
+                    )
+                else:
+                    self.stdout.write(f'Рецепт {task.recipe_id}: готово')
+            if not tasks:
+                if options['once']:
+                    return
+                time.sleep(settings.IMAGE_WORKER_SLEEP)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+from users.models import UserStats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики избранного, корзин, рецептов и подписчиков'
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.recount()
+        users = UserStats.objects.recount()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рецептов: {recipes}, пользователей: {users}'
+        ))
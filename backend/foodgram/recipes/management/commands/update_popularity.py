@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.cache import invalidate_responses
+from api.checks import shared_cache_check
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает популярность рецептов за последние дни'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='пересчитать один раз и завершиться'
+        )
+
+    def handle(self, *args, **options):
+        errors = shared_cache_check(None)
+        if errors:
+            raise CommandError(errors[0].msg)
+        while True:
+            updated = Recipe.objects.update_popularity(
+                timezone.now() - timedelta(
+                    days=settings.POPULARITY_WINDOW_DAYS
+                )
+            )
+            if updated:
+                # popularity is only in the ordering, not in recipe cards
+                invalidate_responses('recipes')
+            self.stdout.write(f'Обновлено рецептов: {updated}')
+            if options['once']:
+                return
+            time.sleep(settings.POPULARITY_UPDATE_INTERVAL)
@@ -0,0 +1,233 @@
+# Generated by Django 3.2 on 2026-10-18 19:05
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import recipes.storage
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Basket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'verbose_name': 'Корзина покупок',
+            },
+        ),
+        migrations.CreateModel(
+            name='Favorite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата добавления')),
+            ],
+            options={
+                'verbose_name': 'Избранное',
+            },
+        ),
+        migrations.CreateModel(
+            name='ImageUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('file', models.ImageField(storage=recipes.storage.ContentAddressedStorage(), upload_to='recipes/images/')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Загруженная картинка',
+            },
+        ),
+        migrations.CreateModel(
+            name='Ingredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('measurement_unit', models.CharField(max_length=200)),
+            ],
+            options={
+                'verbose_name': 'Ингредиент',
+                'verbose_name_plural': 'Ингредиенты',
+            },
+        ),
+        migrations.CreateModel(
+            name='IngredientInRecipe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(32767)])),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_ingredients', to='recipes.ingredient')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Recipe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('image', models.ImageField(storage=recipes.storage.ContentAddressedStorage(), upload_to='recipes/images/', verbose_name='Картинка')),
+                ('text', models.TextField()),
+                ('cooking_time', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('pub_date', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('favorites_count', models.PositiveIntegerField(default=0, verbose_name='Добавлено в избранное')),
+                ('baskets_count', models.PositiveIntegerField(default=0, verbose_name='Добавлено в корзину')),
+                ('popularity', models.PositiveIntegerField(default=0, verbose_name='Добавлено в избранное за неделю')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipes', to=settings.AUTH_USER_MODEL)),
+                ('ingredients', models.ManyToManyField(through='recipes.IngredientInRecipe', to='recipes.Ingredient')),
+            ],
+            options={
+                'verbose_name': 'Рецепт',
+                'verbose_name_plural': 'Рецепты',
+                'ordering': ('-pub_date',),
+            },
+        ),
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('color', models.CharField(max_length=7, unique=True, validators=[django.core.validators.RegexValidator(regex='^#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})$')])),
+                ('slug', models.SlugField(unique=True)),
+            ],
+            options={
+                'verbose_name': 'Тег',
+                'verbose_name_plural': 'Теги',
+            },
+        ),
+        migrations.CreateModel(
+            name='ShoppingListItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField(default=0)),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_list', to='recipes.ingredient')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shopping_list', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Список покупок',
+            },
+        ),
+        migrations.CreateModel(
+            name='RecipeImageTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('processing', 'Обрабатывается'), ('done', 'Готово'), ('failed', 'Ошибка')], default='pending', max_length=10)),
+                ('error', models.TextField(blank=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='image_task', to='recipes.recipe')),
+            ],
+            options={
+                'verbose_name': 'Обработка картинки',
+            },
+        ),
+        migrations.CreateModel(
+            name='RecipeImageRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=16)),
+                ('format', models.CharField(max_length=16)),
+                ('file', models.ImageField(storage=recipes.storage.ContentAddressedStorage(), upload_to='recipes/renditions/')),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='recipes.recipe')),
+            ],
+            options={
+                'verbose_name': 'Вариант картинки',
+                'ordering': ('width',),
+            },
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='tags',
+            field=models.ManyToManyField(related_name='recipes', to='recipes.Tag'),
+        ),
+        migrations.AddField(
+            model_name='ingredientinrecipe',
+            name='recipe',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_ingredients', to='recipes.recipe'),
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_ingredient'),
+        ),
+        migrations.AddField(
+            model_name='imageupload',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='recipes',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='favorite_list', to='recipes.recipe'),
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='favorite_list', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='basket',
+            name='recipes',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='basket_list', to='recipes.recipe'),
+        ),
+        migrations.AddField(
+            model_name='basket',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='basket_list', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='shoppinglistitem',
+            constraint=models.UniqueConstraint(fields=('user', 'ingredient'), name='unique_shopping_list_ingredient'),
+        ),
+        migrations.AddIndex(
+            model_name='recipeimagetask',
+            index=models.Index(fields=['status', 'updated'], name='image_task_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipeimagerendition',
+            constraint=models.UniqueConstraint(fields=('recipe', 'name', 'format'), name='unique_recipe_rendition'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['author', '-pub_date'], name='recipe_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-pub_date', 'id'], name='recipe_pub_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-favorites_count', '-id'], name='recipe_favorites_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-popularity', '-id'], name='recipe_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['cooking_time', 'id'], name='recipe_cooking_time_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ingredientinrecipe',
+            constraint=models.UniqueConstraint(fields=('recipe', 'ingredient'), name='unique_ingredient_in_recipe'),
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['created'], name='favorite_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(fields=('user', 'recipes'), name='unique_favorites_for_recipes'),
+        ),
+        migrations.AddConstraint(
+            model_name='basket',
+            constraint=models.UniqueConstraint(fields=('user', 'recipes'), name='unique_baskets_for_recipes'),
+        ),
+    ]
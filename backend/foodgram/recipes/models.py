@@ -1,7 +1,15 @@
+import uuid
+
 from django.conf import settings
-from django.core.validators import RegexValidator, MinValueValidator
-from django.db import models
-from users.models import User
+from django.core.validators import (
+    MaxValueValidator,
+    MinValueValidator,
+    RegexValidator
+)
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from recipes.storage import content_storage
+from users.models import User, bump_counter
 
 
 class Tag(models.Model):
@@ -31,6 +39,12 @@ class Ingredient(models.Model):
     measurement_unit = models.CharField(max_length=settings.MAX_LENGTH)
 
     class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('name', 'measurement_unit',),
+                name='unique_ingredient'
+            ),
+        ]
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
 
@@ -38,6 +52,54 @@ class Ingredient(models.Model):
         return self.name
 
 
+def get_recipe_prefetches():
+    return (
+        'tags',
+        'renditions',
+        models.Prefetch(
+            'recipe_ingredients',
+            queryset=IngredientInRecipe.objects.select_related('ingredient')
+        )
+    )
+
+
+class RecipeQuerySet(models.QuerySet):
+
+    def bump(self, pk, field, delta=1):
+        bump_counter(self.filter(pk=pk), field, delta)
+
+    def bump_many(self, pks, field, delta=1):
+        bump_counter(self.filter(pk__in=pks), field, delta)
+
+    def recount(self):
+        return self.update(**{
+            field: Coalesce(models.Subquery(
+                model.objects.filter(
+                    recipes=models.OuterRef('pk')
+                ).values('recipes').annotate(
+                    total=models.Count('pk')
+                ).values('total')
+            ), 0)
+            for field, model in (
+                ('favorites_count', Favorite),
+                ('baskets_count', Basket),
+            )
+        })
+
+    def update_popularity(self, since):
+        recent = Favorite.objects.filter(created__gte=since)
+        return self.filter(
+            models.Q(popularity__gt=0)
+            | models.Q(pk__in=recent.values('recipes'))
+        ).update(popularity=Coalesce(models.Subquery(
+            recent.filter(
+                recipes=models.OuterRef('pk')
+            ).values('recipes').annotate(
+                total=models.Count('pk')
+            ).values('total')
+        ), 0))
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -47,7 +109,8 @@ class Recipe(models.Model):
     name = models.CharField(max_length=settings.MAX_LENGTH, )
     image = models.ImageField(
         'Картинка',
-        upload_to='recipes/images/'
+        upload_to='recipes/images/',
+        storage=content_storage
     )
     text = models.TextField()
     ingredients = models.ManyToManyField(
@@ -65,15 +128,59 @@ class Recipe(models.Model):
         'Дата создания',
         auto_now_add=True
     )
+    favorites_count = models.PositiveIntegerField(
+        'Добавлено в избранное',
+        default=0
+    )
+    baskets_count = models.PositiveIntegerField(
+        'Добавлено в корзину',
+        default=0
+    )
+    popularity = models.PositiveIntegerField(
+        'Добавлено в избранное за неделю',
+        default=0
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='recipe_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('-pub_date', 'id'),
+                name='recipe_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=('-favorites_count', '-id'),
+                name='recipe_favorites_count_idx'
+            ),
+            models.Index(
+                fields=('-popularity', '-id'),
+                name='recipe_popularity_idx'
+            ),
+            models.Index(
+                fields=('cooking_time', 'id'),
+                name='recipe_cooking_time_idx'
+            ),
+        ]
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
 
     def __str__(self):
         return self.text[:settings.SHOW_RECIPE_TEXT]
 
+    def ingredient_amounts(self):
+        amounts = {}
+        for ingredient_id, amount in self.recipe_ingredients.values_list(
+            'ingredient_id', 'amount'
+        ):
+            amounts[ingredient_id] = amounts.get(ingredient_id, 0) + amount
+        return amounts
+
 
 class IngredientInRecipe(models.Model):
     recipe = models.ForeignKey(
@@ -87,9 +194,20 @@ class IngredientInRecipe(models.Model):
         related_name='recipe_ingredients'
     )
     amount = models.PositiveSmallIntegerField(
-        validators=[MinValueValidator(1)]
+        validators=[
+            MinValueValidator(1),
+            MaxValueValidator(settings.MAX_AMOUNT)
+        ]
     )
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('recipe', 'ingredient',),
+                name='unique_ingredient_in_recipe'
+            ),
+        ]
+
 
 class Favorite(models.Model):
     user = models.ForeignKey(
@@ -102,14 +220,21 @@ class Favorite(models.Model):
         on_delete=models.CASCADE,
         related_name='favorite_list'
     )
+    created = models.DateTimeField(
+        'Дата добавления',
+        auto_now_add=True
+    )
 
     class Meta:
         constraints = [
             models.UniqueConstraint(
-                fields=('recipes', 'user',),
+                fields=('user', 'recipes',),
                 name='unique_favorites_for_recipes'
             ),
         ]
+        indexes = [
+            models.Index(fields=('created',), name='favorite_created_idx'),
+        ]
         verbose_name = 'Избранное'
 
 
@@ -128,8 +253,197 @@ class Basket(models.Model):
     class Meta:
         constraints = [
             models.UniqueConstraint(
-                fields=('recipes', 'user',),
+                fields=('user', 'recipes',),
                 name='unique_baskets_for_recipes'
             ),
         ]
         verbose_name = 'Корзина покупок'
+
+
+class ShoppingListQuerySet(models.QuerySet):
+
+    def apply(self, user_ids, amounts):
+        amounts = {
+            ingredient_id: amount
+            for ingredient_id, amount in amounts.items() if amount
+        }
+        if not user_ids or not amounts:
+            return
+        with transaction.atomic():
+            self.bulk_create([
+                self.model(user_id=user_id, ingredient_id=ingredient_id)
+                for user_id in user_ids
+                for ingredient_id, amount in amounts.items() if amount > 0
+            ], ignore_conflicts=True)
+            self.filter(
+                user__in=user_ids,
+                ingredient__in=amounts
+            ).update(amount=models.F('amount') + models.Case(
+                *(models.When(ingredient_id=ingredient_id, then=amount)
+                  for ingredient_id, amount in amounts.items()),
+                output_field=models.IntegerField()
+            ))
+            self.filter(user__in=user_ids, amount__lte=0).delete()
+
+    def add_recipe(self, user_id, recipe, sign=1):
+        self.apply([user_id], {
+            ingredient_id: sign * amount
+            for ingredient_id, amount in recipe.ingredient_amounts().items()
+        })
+
+    def add_recipes(self, user_id, recipe_ids, sign=1):
+        self.apply([user_id], {
+            row['ingredient']: sign * row['total']
+            for row in IngredientInRecipe.objects.filter(
+                recipe__in=recipe_ids
+            ).values('ingredient').annotate(total=models.Sum('amount'))
+        })
+
+    def apply_recipe_delta(self, recipe, amounts):
+        self.apply(
+            list(recipe.basket_list.values_list('user_id', flat=True)),
+            amounts
+        )
+
+    def apply_recipe_change(self, recipe, old_amounts):
+        new_amounts = recipe.ingredient_amounts()
+        self.apply_recipe_delta(recipe, {
+            ingredient_id: (new_amounts.get(ingredient_id, 0)
+                            - old_amounts.get(ingredient_id, 0))
+            for ingredient_id in new_amounts.keys() | old_amounts.keys()
+        })
+
+    def rebuild(self, users=None):
+        baskets = Basket.objects.all()
+        items = self.all()
+        if users is not None:
+            baskets = baskets.filter(user__in=users)
+            items = items.filter(user__in=users)
+        totals = IngredientInRecipe.objects.filter(
+            recipe__basket_list__in=baskets
+        ).values(
+            'recipe__basket_list__user', 'ingredient'
+        ).annotate(total=models.Sum('amount'))
+        with transaction.atomic():
+            items.delete()
+            self.bulk_create([
+                self.model(user_id=row['recipe__basket_list__user'],
+                           ingredient_id=row['ingredient'],
+                           amount=row['total'])
+                for row in totals
+            ])
+
+
+class ShoppingListItem(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_list'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shopping_list'
+    )
+    amount = models.IntegerField(default=0)
+
+    objects = ShoppingListQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'ingredient',),
+                name='unique_shopping_list_ingredient'
+            ),
+        ]
+        verbose_name = 'Список покупок'
+
+    def __str__(self):
+        return f'{self.ingredient}: {self.amount}'
+
+
+class RecipeImageTask(models.Model):
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (PROCESSING, 'Обрабатывается'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='image_task'
+    )
+    status = models.CharField(
+        max_length=max(len(status) for status, _ in STATUSES),
+        choices=STATUSES,
+        default=PENDING
+    )
+    error = models.TextField(blank=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=('status', 'updated'),
+                name='image_task_status_idx'
+            ),
+        ]
+        verbose_name = 'Обработка картинки'
+
+    def __str__(self):
+        return f'{self.recipe_id}: {self.status}'
+
+
+class RecipeImageRendition(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='renditions'
+    )
+    name = models.CharField(max_length=settings.RENDITION_NAME_MAX_LENGTH)
+    format = models.CharField(max_length=settings.RENDITION_NAME_MAX_LENGTH)
+    file = models.ImageField(
+        upload_to='recipes/renditions/',
+        storage=content_storage
+    )
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ('width',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=('recipe', 'name', 'format',),
+                name='unique_recipe_rendition'
+            ),
+        ]
+        verbose_name = 'Вариант картинки'
+
+    def __str__(self):
+        return f'{self.recipe_id}: {self.name}.{self.format}'
+
+
+class ImageUpload(models.Model):
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='image_uploads'
+    )
+    file = models.ImageField(
+        upload_to='recipes/images/',
+        storage=content_storage
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Загруженная картинка'
+
+    def __str__(self):
+        return str(self.token)
@@ -0,0 +1,73 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+from recipes.models import Ingredient
+
+
+def normalize(value):
+    return value.strip().casefold().replace('ё', 'е')
+
+
+class IngredientIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = ([], [])
+        self._loaded_at = None
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def _is_fresh(self):
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at
+            < settings.INGREDIENT_INDEX_TTL
+        )
+
+    def _load(self):
+        rows = sorted(
+            (
+                (normalize(row['name']), row['id'], row)
+                for row in Ingredient.objects.values(
+                    'id', 'name', 'measurement_unit'
+                )
+            ),
+            key=lambda item: item[:2]
+        )
+        self._snapshot = (
+            [key for key, _, _ in rows], [row for _, _, row in rows]
+        )
+        self._loaded_at = time.monotonic()
+
+    def _get_snapshot(self):
+        if not self._is_fresh():
+            with self._lock:
+                if not self._is_fresh():
+                    self._load()
+        return self._snapshot
+
+    def search(self, query, limit=None):
+        limit = limit or settings.INGREDIENT_SEARCH_LIMIT
+        query = normalize(query)
+        keys, rows = self._get_snapshot()
+        results = []
+        start = end = bisect_left(keys, query)
+        while (end < len(keys) and len(results) < limit
+               and keys[end].startswith(query)):
+            results.append(rows[end])
+            end += 1
+        for position, key in enumerate(keys):
+            if len(results) >= limit:
+                break
+            if start <= position < end or key.startswith(query):
+                continue
+            if query in key:
+                results.append(rows[position])
+        return results
+
+
+ingredient_index = IngredientIndex()
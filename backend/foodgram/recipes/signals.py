@@ -0,0 +1,89 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.db import transaction
+from django.dispatch import Signal, receiver
+
+from recipes.models import (
+    Basket,
+    Favorite,
+    Ingredient,
+    Recipe,
+    ShoppingListItem
+)
+from recipes.images import enqueue_renditions
+from recipes.search import ingredient_index
+from users.models import UserStats
+
+COUNTERS = {Favorite: 'favorites_count', Basket: 'baskets_count'}
+
+recipe_changed = Signal()
+data_imported = Signal()
+links_changed = Signal()
+
+
+@receiver(post_save, sender=Basket)
+def add_to_shopping_list(sender, instance, created, **kwargs):
+    if created:
+        ShoppingListItem.objects.add_recipe(instance.user_id, instance.recipes)
+
+
+@receiver(pre_delete, sender=Basket)
+def remove_from_shopping_list(sender, instance, **kwargs):
+    ShoppingListItem.objects.add_recipe(
+        instance.user_id, instance.recipes, sign=-1
+    )
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(data_imported, sender=Ingredient)
+def invalidate_ingredient_index(sender, **kwargs):
+    ingredient_index.invalidate()
+
+
+@receiver(recipe_changed, sender=Recipe)
+def update_shopping_lists(sender, instance, changes, **kwargs):
+    ShoppingListItem.objects.apply_recipe_delta(
+        instance, changes['ingredients']['amounts']
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def queue_image_renditions(sender, instance, created, update_fields=None,
+                           **kwargs):
+    if created or update_fields is None or 'image' in update_fields:
+        transaction.on_commit(lambda: enqueue_renditions(instance))
+
+
+@receiver(post_save, sender=Recipe)
+def count_author_recipe(sender, instance, created, **kwargs):
+    if created:
+        UserStats.objects.bump(instance.author_id, 'recipes_count')
+
+
+@receiver(post_delete, sender=Recipe)
+def uncount_author_recipe(sender, instance, **kwargs):
+    UserStats.objects.bump(instance.author_id, 'recipes_count', -1)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=Basket)
+def count_recipe_user(sender, instance, created, **kwargs):
+    if created:
+        Recipe.objects.bump(instance.recipes_id, COUNTERS[sender])
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=Basket)
+def uncount_recipe_user(sender, instance, **kwargs):
+    Recipe.objects.bump(instance.recipes_id, COUNTERS[sender], -1)
+
+
+@receiver(links_changed, sender=Favorite)
+@receiver(links_changed, sender=Basket)
+def count_recipe_users(sender, pks, delta, **kwargs):
+    Recipe.objects.bump_many(pks, COUNTERS[sender], delta)
+
+
+@receiver(links_changed, sender=Basket)
+def update_shopping_list(sender, user_id, pks, delta, **kwargs):
+    ShoppingListItem.objects.add_recipes(user_id, pks, sign=delta)
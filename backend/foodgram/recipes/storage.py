@@ -0,0 +1,82 @@
+import hashlib
+import os
+import uuid
+from collections import Counter
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db.models import FileField
+from django.utils.deconstruct import deconstructible
+
+
+def content_digest(content):
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def digest_name(self, name, digest):
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return os.path.join(directory, digest[:2], digest + extension)
+
+    def _save(self, name, content):
+        name = self.digest_name(name, content_digest(content))
+        if self.exists(name):
+            os.utime(self.path(name))
+            return name
+        directory, filename = os.path.split(name)
+        temporary = super()._save(
+            os.path.join(directory, f'.{uuid.uuid4().hex}.tmp'), content
+        )
+        os.replace(self.path(temporary), self.path(name))
+        return name
+
+    def walk(self, directory):
+        if not self.exists(directory):
+            return
+        directories, files = self.listdir(directory)
+        for filename in files:
+            yield os.path.join(directory, filename)
+        for subdirectory in directories:
+            yield from self.walk(os.path.join(directory, subdirectory))
+
+
+content_storage = ContentAddressedStorage()
+
+
+def get_storage_fields(storage=content_storage):
+    return [
+        field
+        for model in apps.get_models()
+        for field in model._meta.get_fields()
+        if isinstance(field, FileField) and field.storage is storage
+    ]
+
+
+def reference_counts(storage=content_storage):
+    counts = Counter()
+    for field in get_storage_fields(storage):
+        counts.update(
+            field.model.objects.exclude(**{field.name: ''})
+            .values_list(field.name, flat=True).iterator()
+        )
+    return counts
+
+
+def is_referenced(name, storage=content_storage):
+    return any(
+        field.model.objects.filter(**{field.name: name}).exists()
+        for field in get_storage_fields(storage)
+    )
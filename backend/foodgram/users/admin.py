@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from users.models import Follow, User
+from users.models import Follow, User, get_user_stats
 
 
 admin.site.unregister(User)
@@ -8,11 +8,25 @@ admin.site.unregister(User)
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
-    list_display = ('username', 'email', 'first_name', 'last_name')
+    list_display = (
+        'username', 'email', 'first_name', 'last_name', 'recipes_count',
+        'followers_count'
+    )
+    list_select_related = ('stats',)
     search_fields = ('username', 'email')
     list_filter = ('first_name', 'last_name')
     ordering = ('username',)
 
+    @admin.display(description='Рецептов', ordering='stats__recipes_count')
+    def recipes_count(self, obj):
+        return get_user_stats(obj).recipes_count
+
+    @admin.display(
+        description='Подписчиков', ordering='stats__followers_count'
+    )
+    def followers_count(self, obj):
+        return get_user_stats(obj).followers_count
+
 
 @admin.register(Follow)
 class FollowAdmin(admin.ModelAdmin):
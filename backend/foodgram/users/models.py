@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.functions import Coalesce, Greatest
 
 User = get_user_model()
 
@@ -26,3 +27,76 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'{self.user} подписался на {self.author}'
+
+
+def bump_counter(queryset, field, delta=1):
+    return queryset.update(
+        **{field: Greatest(models.F(field) + delta, 0)}
+    )
+
+
+class UserStatsQuerySet(models.QuerySet):
+
+    def bump(self, user_id, field, delta=1):
+        if delta > 0:
+            self.get_or_create(user_id=user_id)
+        bump_counter(self.filter(user_id=user_id), field, delta)
+
+    def bump_many(self, user_ids, field, delta=1):
+        if delta > 0:
+            self.bulk_create(
+                [self.model(user_id=user_id) for user_id in user_ids],
+                ignore_conflicts=True
+            )
+        bump_counter(self.filter(user_id__in=user_ids), field, delta)
+
+    def recount(self):
+        self.bulk_create(
+            [
+                self.model(user_id=pk) for pk in User.objects.filter(
+                    stats__isnull=True
+                ).values_list('pk', flat=True)
+            ],
+            ignore_conflicts=True
+        )
+        return self.update(
+            recipes_count=Coalesce(models.Subquery(
+                User.objects.filter(pk=models.OuterRef('user_id')).annotate(
+                    total=models.Count('recipes')
+                ).values('total')
+            ), 0),
+            followers_count=Coalesce(models.Subquery(
+                Follow.objects.filter(
+                    author=models.OuterRef('user_id')
+                ).values('author').annotate(
+                    total=models.Count('pk')
+                ).values('total')
+            ), 0)
+        )
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь')
+    recipes_count = models.PositiveIntegerField('Рецептов', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+
+    objects = UserStatsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name_plural = 'Счётчики пользователей'
+        verbose_name = 'Счётчики пользователя'
+
+    def __str__(self):
+        return f'{self.user}: {self.recipes_count}, {self.followers_count}'
+
+
+def get_user_stats(user):
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return UserStats(user=user)
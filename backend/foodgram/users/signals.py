@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from recipes.signals import links_changed
+from users.models import Follow, User, UserStats
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Follow)
+def count_follower(sender, instance, created, **kwargs):
+    if created:
+        UserStats.objects.bump(instance.author_id, 'followers_count')
+
+
+@receiver(post_delete, sender=Follow)
+def uncount_follower(sender, instance, **kwargs):
+    UserStats.objects.bump(instance.author_id, 'followers_count', -1)
+
+
+@receiver(links_changed, sender=Follow)
+def count_followers(sender, pks, delta, **kwargs):
+    UserStats.objects.bump_many(pks, 'followers_count', delta)